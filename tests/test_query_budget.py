@@ -0,0 +1,28 @@
+import pytest
+from django.core.cache import cache
+
+
+class TestQueryBudget:
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    @pytest.mark.django_db
+    @pytest.mark.query_budget(3)
+    def test_index_budget(self, client, few_posts_with_group):
+        response = client.get('/')
+        assert response.status_code == 200
+
+    @pytest.mark.django_db
+    @pytest.mark.query_budget(9)
+    def test_profile_budget(self, client, few_posts_with_group):
+        response = client.get(f'/{few_posts_with_group.author.username}/')
+        assert response.status_code == 200
+
+    @pytest.mark.django_db
+    @pytest.mark.query_budget(5)
+    def test_follow_index_budget(
+            self, user_client, another_few_posts_with_group_with_follower):
+        response = user_client.get('/follow/')
+        assert response.status_code == 200
@@ -1,5 +1,25 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished, request_started
+from django.db.backends.signals import connection_created
+
+from . import prometheus
+from .db.sqlite import apply_pragmas
+from .tiered import tiered
+
+
+def count_connection(sender, connection, **kwargs):
+    if getattr(connection, 'reused', False):
+        return
+    prometheus.inc(
+        'yatube_db_connections_opened_total', {'alias': connection.alias}
+    )
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        connection_created.connect(apply_pragmas)
+        connection_created.connect(count_connection)
+        request_started.connect(tiered.start_request)
+        request_finished.connect(tiered.finish_request)
@@ -0,0 +1,262 @@
+"""Кеш в файле SQLite, общий для всех воркеров одного сервера.
+
+LocMemCache у каждого процесса свой: после записи соседние воркеры
+отдают старую копию, а invalidate() чистит только свой процесс. Этот
+бэкенд хранит записи в одном файле SQLite в режиме WAL: чтения не ждут
+записи, файл отображается в память (mmap), а сетевой сервис вроде
+memcached не нужен.
+
+    CACHES = {'default': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }}
+
+Целые числа хранятся как INTEGER, поэтому incr() — UPDATE и SELECT
+в одной транзакции, без чтения значения в Python. Вытеснение — LRU
+по времени последнего чтения; чтобы чтение не превращалось в запись,
+время обновляется не чаще раза в LRU_RESOLUTION секунд на ключ.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Срок «навсегда»: сравнивается с time.time() как обычный срок.
+NEVER = float(2 ** 53)
+INT_LIMIT = 2 ** 62
+# SQLite до 3.32 принимает не больше 999 параметров в запросе; списки
+# ключей для IN (...) делятся на части с запасом под остальные.
+CHUNK_SIZE = 900
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    ' key TEXT PRIMARY KEY, value BLOB NOT NULL,'
+    ' expires REAL NOT NULL, accessed REAL NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+)
+
+PRAGMAS = (
+    'PRAGMA journal_mode = wal',
+    # Кеш не жалко потерять при сбое питания, fsync не нужен.
+    'PRAGMA synchronous = off',
+    'PRAGMA mmap_size = 268435456',
+)
+
+
+def chunks(items):
+    items = list(items)
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start:start + CHUNK_SIZE]
+
+
+class SQLiteCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = location
+        self.busy_timeout = options.get('BUSY_TIMEOUT', 5)
+        self.lru_resolution = options.get('LRU_RESOLUTION', 10)
+        # Число записей проверяется раз в столько set() процесса.
+        self.cull_every = options.get('CULL_EVERY', 32)
+        self._local = threading.local()
+        self._writes = 0
+
+    @property
+    def connection(self):
+        local = self._local
+        # После fork соединение родителя использовать нельзя.
+        if getattr(local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            for statement in PRAGMAS + SCHEMA:
+                connection.execute(statement)
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def encode(self, value):
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, self.pickle_protocol)
+
+    @staticmethod
+    def decode(value):
+        return value if isinstance(value, int) else pickle.loads(value)
+
+    def expires(self, timeout):
+        expires = self.get_backend_timeout(timeout)
+        return NEVER if expires is None else expires
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self.key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        now = time.time()
+        rows = []
+        for chunk in chunks(keys):
+            rows += self.connection.execute(
+                f'SELECT key, value, accessed FROM cache '
+                f'WHERE key IN ({", ".join("?" * len(chunk))}) '
+                f'AND expires > ?',
+                [*chunk, now]
+            ).fetchall()
+        stale = [key for key, _, accessed in rows
+                 if accessed < now - self.lru_resolution]
+        for chunk in chunks(stale):
+            self.connection.execute(
+                f'UPDATE cache SET accessed = ? '
+                f'WHERE key IN ({", ".join("?" * len(chunk))})',
+                [now, *chunk]
+            )
+        return {keys[key]: self.decode(value) for key, value, _ in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.expires(timeout)
+        now = time.time()
+        rows = [
+            (self.key(key, version), self.encode(value), expires, now)
+            for key, value in data.items()
+        ]
+        with self.transaction() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', rows
+            )
+        self.written(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.key(key, version)
+        with self.transaction() as connection:
+            connection.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (key, time.time())
+            )
+            added = connection.execute(
+                'INSERT OR IGNORE INTO cache VALUES (?, ?, ?, ?)',
+                (key, self.encode(value), self.expires(timeout), time.time())
+            ).rowcount == 1
+        if added:
+            self.written(1)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        row = None
+        if abs(delta) < INT_LIMIT:
+            # UPDATE ... RETURNING есть только с SQLite 3.35, поэтому
+            # новое значение читается отдельным SELECT в той же
+            # транзакции: между ними чужой incr() вклиниться не может.
+            name = self.key(key, version)
+            with self.transaction() as connection:
+                # Вблизи 2**63 SQLite при переполнении перешёл бы на REAL.
+                updated = connection.execute(
+                    'UPDATE cache SET value = value + ? WHERE key = ? AND '
+                    "expires > ? AND typeof(value) = 'integer' AND "
+                    'abs(value) < ?',
+                    (delta, name, time.time(), INT_LIMIT)
+                ).rowcount
+                if updated:
+                    row = connection.execute(
+                        'SELECT value FROM cache WHERE key = ?', (name,)
+                    ).fetchone()
+        if row is None:
+            # Нет ключа или значение не целое: как у остальных бэкендов.
+            return super().incr(key, delta, version)
+        return row[0]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.connection.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? AND expires > ?',
+            (self.expires(timeout), self.key(key, version), time.time())
+        ).rowcount == 1
+
+    def has_key(self, key, version=None):
+        return self.connection.execute(
+            'SELECT 1 FROM cache WHERE key = ? AND expires > ?',
+            (self.key(key, version), time.time())
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self.key(key, version) for key in keys]
+        for chunk in chunks(keys):
+            self.connection.execute(
+                f'DELETE FROM cache WHERE key IN '
+                f'({", ".join("?" * len(chunk))})', chunk
+            )
+
+    def clear(self):
+        self.connection.execute('DELETE FROM cache')
+
+    def transaction(self):
+        return Transaction(self.connection)
+
+    def written(self, count):
+        self._writes += count
+        if self._writes >= self.cull_every:
+            self._writes = 0
+            self.cull()
+
+    def cull(self):
+        """Удаляет истёкшие записи, а при переполнении — давно не читанные.
+
+        Между проверками кеш может превысить MAX_ENTRIES на CULL_EVERY
+        записей от каждого процесса.
+        """
+        with self.transaction() as connection:
+            connection.execute(
+                'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+            )
+            count, = connection.execute(
+                'SELECT COUNT(*) FROM cache'
+            ).fetchone()
+            if count <= self._max_entries:
+                return
+            if self._cull_frequency == 0:
+                connection.execute('DELETE FROM cache')
+                return
+            connection.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY accessed LIMIT ?)',
+                (count - self._max_entries
+                 + self._max_entries // self._cull_frequency,)
+            )
+
+
+class Transaction:
+    """BEGIN IMMEDIATE: блокировка записи берётся сразу, а не посреди
+    транзакции, где SQLite не может дождаться её и падает с ошибкой.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute('ROLLBACK' if exc_type else 'COMMIT')
@@ -0,0 +1,85 @@
+"""Пул соединений с базой внутри процесса.
+
+Django открывает соединение на поток и закрывает его в конце запроса
+(или через CONN_MAX_AGE). С пулом «закрытое» соединение возвращается в
+очередь и достаётся следующему потоку без нового подключения. POOL_SIZE
+в настройках базы — сколько простаивающих соединений держать; сверх
+этого соединения закрываются как обычно.
+"""
+import os
+import queue
+import threading
+
+_lock = threading.Lock()
+_pools = {}
+_pid = None
+
+
+def get_pool(alias, size):
+    global _pid
+    with _lock:
+        # После fork соединения родителя использовать нельзя.
+        if _pid != os.getpid():
+            _pid = os.getpid()
+            _pools.clear()
+        if alias not in _pools:
+            _pools[alias] = queue.LifoQueue(maxsize=size)
+        return _pools[alias]
+
+
+def discard(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+class PooledDatabaseWrapperMixin:
+    """Подмешивается перед DatabaseWrapper бэкенда Django."""
+
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict.get('POOL_SIZE', 1))
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool()
+        while True:
+            try:
+                raw = pool.get_nowait()
+            except queue.Empty:
+                self.reused = False
+                return super().get_new_connection(conn_params)
+            if self.is_raw_usable(raw):
+                # connection_created придёт и для соединения из пула;
+                # по этому флагу обработчики отличают его от нового.
+                self.reused = True
+                return raw
+            discard(raw)
+
+    def _close(self):
+        raw = self.connection
+        if raw is None:
+            return None
+        if self.in_atomic_block or not self.reset_raw(raw):
+            return super()._close()
+        try:
+            self.pool().put_nowait(raw)
+        except queue.Full:
+            return super()._close()
+        return None
+
+    def reset_raw(self, raw):
+        """Откатывает незавершённое, чтобы отдать соединение чистым."""
+        try:
+            raw.rollback()
+        except Exception:
+            return False
+        return True
+
+    def is_raw_usable(self, raw):
+        try:
+            cursor = raw.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+        except Exception:
+            return False
+        return True
@@ -0,0 +1,64 @@
+"""Чтение с реплики для представлений, которые только читают.
+
+Представление, обёрнутое в replica_reads, читает с базы REPLICA, если она
+настроена. Запись всегда идёт в default. После записи пользователь
+несколько секунд читает с default (кука от PrimaryPinMiddleware), чтобы
+не увидеть устаревшие данные из-за задержки репликации.
+"""
+import threading
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA = 'replica'
+PIN_COOKIE = 'pin_primary'
+
+_state = threading.local()
+
+
+def replica_enabled():
+    return REPLICA in settings.DATABASES
+
+
+def replica_reads(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        pinned = PIN_COOKIE in request.COOKIES
+        _state.replica, _state.pinned = not pinned, pinned
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.replica = _state.pinned = False
+    return wrapper
+
+
+def primary_pinned():
+    """Запрос в replica_reads закреплён за default после записи.
+
+    Общие кеши такой запрос обходит: страницу в них мог положить
+    соседний запрос, прочитавший отстающую реплику.
+    """
+    return getattr(_state, 'pinned', False) and replica_enabled()
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if getattr(_state, 'replica', False) and replica_enabled():
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return {obj1._state.db, obj2._state.db} <= {
+            DEFAULT_DB_ALIAS, REPLICA, None
+        }
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплика получает схему вместе с данными.
+        return db != REPLICA
@@ -0,0 +1,17 @@
+"""Настройка соединений с SQLite через PRAGMA."""
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS для каждого нового соединения с SQLite.
+
+    Для отдельной базы набор можно переопределить ключом PRAGMAS в её
+    настройках.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get('PRAGMAS', settings.SQLITE_PRAGMAS)
+    for name, value in pragmas.items():
+        # Напрямую через sqlite3: служебные запросы не должны попадать в
+        # счётчики запросов Django.
+        connection.connection.execute(f'PRAGMA {name} = {value}')
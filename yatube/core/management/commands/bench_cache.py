@@ -0,0 +1,105 @@
+import multiprocessing
+import shutil
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from core.cache import SQLiteCache
+
+# Похоже на закешированную страницу ленты: десять постов с текстом.
+PAGE = {
+    'rows': [
+        {'pk': pk, 'text': 'Текст поста. ' * 30, 'author': 'leo',
+         'group': 'cats', 'comments': pk % 7}
+        for pk in range(10)
+    ],
+    'next': 'cD0yMDIx', 'previous': None,
+}
+
+
+def backends(directory):
+    params = {'OPTIONS': {'MAX_ENTRIES': 100000}}
+    return {
+        'locmem': lambda: LocMemCache('bench', params),
+        'file': lambda: FileBasedCache(f'{directory}/file', params),
+        'sqlite': lambda: SQLiteCache(f'{directory}/cache.sqlite3', params),
+    }
+
+
+def increment(factory, count):
+    cache = factory()
+    for _ in range(count):
+        cache.incr('counter')
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает LocMemCache, FileBasedCache и core.cache.SQLiteCache: '
+            'время операций и общий для процессов счётчик incr().')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operations', type=int, default=2000)
+        parser.add_argument('--processes', type=int, default=4)
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        try:
+            factories = backends(directory)
+            self.stdout.write(
+                f'{"":<8}{"get":>9}{"промах":>9}{"set":>9}'
+                f'{"get_many":>10}{"incr":>9}   мкс на операцию'
+            )
+            for name, factory in factories.items():
+                self.stdout.write(f'{name:<8}' + ''.join(
+                    f'{value:>{width}.1f}' for value, width in zip(
+                        self.timings(factory(), options['operations']),
+                        (9, 9, 9, 10, 9)
+                    )
+                ))
+            for name, factory in factories.items():
+                self.shared_counter(name, factory, options)
+        finally:
+            shutil.rmtree(directory)
+
+    def timings(self, cache, operations):
+        keys = [f'posts:feed:index:{number}' for number in range(100)]
+        cache.set_many({key: PAGE for key in keys})
+        cache.set('counter', 0)
+
+        def measure(action):
+            started = time.perf_counter()
+            for number in range(operations):
+                action(number)
+            return (time.perf_counter() - started) / operations * 1e6
+
+        return (
+            measure(lambda number: cache.get(keys[number % 100])),
+            measure(lambda number: cache.get(f'missing:{number}')),
+            measure(lambda number: cache.set(keys[number % 100], PAGE)),
+            measure(lambda number: cache.get_many(keys[:10])),
+            measure(lambda number: cache.incr('counter')),
+        )
+
+    def shared_counter(self, name, factory, options):
+        """Процессы одновременно увеличивают общий счётчик."""
+        cache = factory()
+        cache.set('counter', 0)
+        count = options['operations'] // options['processes']
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=increment, args=(factory, count))
+            for _ in range(options['processes'])
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name:<8} {options["processes"]} процесса × {count} incr: '
+            f'счётчик {cache.get("counter")} из '
+            f'{count * options["processes"]}, {elapsed:.2f} с'
+        )
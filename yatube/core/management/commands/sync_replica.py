@@ -0,0 +1,28 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db.routers import REPLICA
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файл реплики; имитация '
+            'репликации для локальной проверки.')
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError('Реплика не настроена: задайте DB_REPLICA=1.')
+        source = connections['default']
+        if source.vendor != 'sqlite':
+            raise CommandError(
+                'Для PostgreSQL реплику ведёт сервер базы данных.'
+            )
+        source.ensure_connection()
+        target = sqlite3.connect(settings.DATABASES[REPLICA]['NAME'])
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(self.style.SUCCESS('Реплика обновлена'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templates import warm
+
+
+class Command(BaseCommand):
+    help = ('Компилирует все шаблоны из templates/: прогрев кеша и '
+            'проверка, что шаблоны разбираются без ошибок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--apps', action='store_true',
+            help='Также шаблоны приложений (admin и др.).'
+        )
+
+    def handle(self, *args, **options):
+        count, errors, elapsed = warm(with_apps=options['apps'])
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'Ошибок в шаблонах: {len(errors)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {count} за {elapsed * 1000:.0f} мс'
+        ))
@@ -0,0 +1,145 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.template import base
+
+# Верхние границы корзин гистограмм, включительно; последняя — +Inf.
+MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+BUCKETS = {
+    'latency_ms': MS_BUCKETS,
+    'sql_ms': MS_BUCKETS,
+    'template_ms': MS_BUCKETS,
+    'queries': QUERY_BUCKETS,
+}
+
+_local = threading.local()
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def as_dict(self):
+        return {
+            'buckets': dict(zip(
+                [str(bound) for bound in self.bounds] + ['+Inf'],
+                self.counts
+            )),
+            'count': sum(self.counts),
+            'sum': self.sum,
+        }
+
+
+class Registry:
+    """Гистограммы по представлениям, общие для потоков процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, sample):
+        with self.lock:
+            histograms = self.views.setdefault(view, {
+                name: Histogram(bounds) for name, bounds in BUCKETS.items()
+            })
+            for name, value in sample.values().items():
+                histograms[name].observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view: {
+                    name: histogram.as_dict()
+                    for name, histogram in histograms.items()
+                }
+                for view, histograms in self.views.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+REGISTRY = Registry()
+
+
+class Sample:
+    """Замер одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latency = 0
+        self.queries = 0
+        self.sql = 0
+        self.template = 0
+        self.depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка для connection.execute_wrapper.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+
+    def finish(self):
+        self.latency = time.perf_counter() - self.started
+
+    def values(self):
+        return {
+            'latency_ms': self.latency * 1000,
+            'sql_ms': self.sql * 1000,
+            'template_ms': self.template * 1000,
+            'queries': self.queries,
+        }
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.sql * 1000:.1f};desc="{self.queries} queries", '
+            f'tpl;dur={self.template * 1000:.1f}, '
+            f'total;dur={self.latency * 1000:.1f}'
+        )
+
+
+def current():
+    return getattr(_local, 'sample', None)
+
+
+def activate(sample):
+    _local.sample = sample
+
+
+def instrument_templates():
+    """Оборачивает Template.render, чтобы считать время шаблонов.
+
+    Вложенные шаблоны ({% include %}, {% extends %}) уже входят во время
+    внешнего, поэтому считается только верхний уровень.
+    """
+    render = base.Template.render
+    if getattr(render, 'instrumented', False):
+        return
+
+    def timed_render(self, context):
+        sample = current()
+        if sample is None:
+            return render(self, context)
+        sample.depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            sample.depth -= 1
+            if not sample.depth:
+                sample.template += time.perf_counter() - started
+
+    timed_render.instrumented = True
+    base.Template.render = timed_render
@@ -0,0 +1,117 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics, prometheus, querywatch
+from .db import routers
+
+
+class InstrumentationMiddleware:
+    """Счётчики запросов для /metrics и подробные замеры по выборке.
+
+    Число ответов и время ответа по имени URL пишутся в метрики
+    Prometheus для каждого запроса, если включён METRICS_ENABLED.
+    Запросы к базе, время SQL и шаблонов замеряются для доли запросов
+    INSTRUMENTATION_SAMPLE_RATE. Когда выключено и то и другое,
+    middleware отключается целиком и ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        self.rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        self.enabled = settings.METRICS_ENABLED
+        if self.rate <= 0 and not self.enabled:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if self.rate > 0:
+            metrics.instrument_templates()
+
+    def __call__(self, request):
+        if self.rate > 0 and random.random() < self.rate:
+            return self.sampled(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.count(request, response, time.perf_counter() - started)
+        return response
+
+    def sampled(self, request):
+        sample = metrics.Sample()
+        metrics.activate(sample)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(sample))
+                response = self.get_response(request)
+        finally:
+            metrics.activate(None)
+        sample.finish()
+
+        metrics.REGISTRY.observe(view_name(request), sample)
+        response['Server-Timing'] = sample.server_timing()
+        self.count(request, response, sample.latency)
+        if self.enabled:
+            prometheus.inc(
+                'yatube_db_queries_total', {'view': view_name(request)},
+                sample.queries
+            )
+        return response
+
+    def count(self, request, response, latency):
+        if not self.enabled:
+            return
+        view = view_name(request)
+        prometheus.inc('yatube_requests_total', {
+            'view': view, 'status': response.status_code,
+        })
+        prometheus.observe(
+            'yatube_request_duration_seconds', latency, {'view': view}
+        )
+
+
+class QueryWatchMiddleware:
+    """Пишет в журнал core.queries N+1 и медленные запросы (стейджинг).
+
+    Включается настройкой QUERY_WATCH; иначе отключается целиком.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_WATCH:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with querywatch.watch() as watcher:
+            response = self.get_response(request)
+        if watcher.n_plus_one():
+            querywatch.logger.warning(
+                'Похоже на N+1 в %s (%s):\n%s',
+                request.path, view_name(request), watcher.report()
+            )
+        return response
+
+
+class PrimaryPinMiddleware:
+    """После записи пользователь какое-то время читает с основной базы."""
+
+    def __init__(self, get_response):
+        if not routers.replica_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and response.status_code < 400):
+            response.set_cookie(
+                routers.PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True
+            )
+        return response
+
+
+def view_name(request):
+    match = request.resolver_match
+    return match.view_name if match else 'unresolved'
@@ -0,0 +1,199 @@
+"""Метрики в формате Prometheus, общие для воркеров gunicorn.
+
+Каждый процесс пишет значения в свой файл metrics-<pid>.db в каталоге
+METRICS_DIR через mmap: запись — это struct.pack_into по смещению,
+без блокировок между процессами. /metrics читает все файлы каталога и
+складывает значения. Без METRICS_DIR значения живут в памяти процесса.
+"""
+import glob
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+METRICS = {
+    'yatube_requests_total': (
+        'counter', 'HTTP-запросы по имени URL и коду ответа.'),
+    'yatube_request_duration_seconds': (
+        'histogram', 'Время ответа по имени URL.'),
+    'yatube_feed_cache_requests_total': (
+        'counter', 'Обращения к кешу страниц ленты: hit или miss.'),
+    'yatube_tiered_cache_requests_total': (
+        'counter', 'Обращения к двухуровневому кешу: l1, l2 или miss.'),
+    'yatube_thumbnail_duration_seconds': (
+        'histogram', 'Время построения миниатюр одного поста.'),
+    'yatube_db_connections_opened_total': (
+        'counter', 'Открытые соединения с базой.'),
+    'yatube_db_queries_total': (
+        'counter', 'Запросы к базе в замеренных HTTP-запросах.'),
+}
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HISTOGRAM_SUFFIXES = ('_bucket', '_sum', '_count')
+
+INITIAL_SIZE = 1 << 16
+HEADER = struct.Struct('i4x')
+VALUE = struct.Struct('d')
+
+
+class MmapValues:
+    """Словарь ключ -> число поверх файла одного процесса.
+
+    Формат: заголовок с числом занятых байт, затем записи
+    [длина ключа][ключ, выровненный до 8 байт][double]. Запись
+    добавляется целиком до того, как сдвигается заголовок, поэтому
+    читатели из других процессов видят только готовые записи.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(INITIAL_SIZE)
+        self.map()
+        self.positions = {
+            key: position for key, position, _ in read_entries(self.mmap)
+        }
+
+    def map(self):
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+        self.used = HEADER.unpack_from(self.mmap)[0] or HEADER.size
+        HEADER.pack_into(self.mmap, 0, self.used)
+
+    def add_key(self, key):
+        encoded = key.encode()
+        padded = len(encoded) + (-(4 + len(encoded)) % 8)
+        entry = struct.pack(f'i{padded}s', len(encoded), encoded)
+        size = len(entry) + VALUE.size
+        while self.used + size > len(self.mmap):
+            self.mmap.close()
+            self.file.truncate(os.fstat(self.file.fileno()).st_size * 2)
+            self.map()
+        self.mmap[self.used:self.used + len(entry)] = entry
+        position = self.used + len(entry)
+        VALUE.pack_into(self.mmap, position, 0)
+        self.used += size
+        HEADER.pack_into(self.mmap, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def inc(self, key, amount):
+        position = self.positions.get(key) or self.add_key(key)
+        value = VALUE.unpack_from(self.mmap, position)[0]
+        VALUE.pack_into(self.mmap, position, value + amount)
+
+
+class MemoryValues:
+    def __init__(self):
+        self.values = defaultdict(float)
+
+    def inc(self, key, amount):
+        self.values[key] += amount
+
+
+def read_entries(data):
+    used = HEADER.unpack_from(data)[0]
+    position = HEADER.size
+    while position < used:
+        length = struct.unpack_from('i', data, position)[0]
+        key = bytes(data[position + 4:position + 4 + length]).decode()
+        position += 4 + length + (-(4 + length) % 8)
+        yield key, position, VALUE.unpack_from(data, position)[0]
+        position += VALUE.size
+
+
+_lock = threading.Lock()
+_store = None
+_pid = None
+
+
+def store():
+    """Хранилище текущего процесса; после fork открывается новый файл."""
+    global _store, _pid
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        if settings.METRICS_DIR:
+            _store = MmapValues(
+                os.path.join(settings.METRICS_DIR, f'metrics-{_pid}.db')
+            )
+        else:
+            _store = MemoryValues()
+    return _store
+
+
+def sample_key(name, labels):
+    if not labels:
+        return name
+    pairs = ','.join(
+        f'{label}="{escape(value)}"'
+        for label, value in sorted(labels.items())
+    )
+    return f'{name}{{{pairs}}}'
+
+
+def escape(value):
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def inc(name, labels=None, amount=1):
+    with _lock:
+        store().inc(sample_key(name, labels), amount)
+
+
+def observe(name, value, labels=None, buckets=BUCKETS):
+    labels = labels or {}
+    with _lock:
+        values = store()
+        # Пустые корзины тоже заводятся: гистограмме нужны все границы.
+        for bound in buckets:
+            values.inc(sample_key(
+                f'{name}_bucket', {**labels, 'le': bound}
+            ), int(value <= bound))
+        values.inc(
+            sample_key(f'{name}_bucket', {**labels, 'le': '+Inf'}), 1
+        )
+        values.inc(sample_key(f'{name}_sum', labels), value)
+        values.inc(sample_key(f'{name}_count', labels), 1)
+
+
+def collect():
+    """Значения всех процессов, сложенные по ключу."""
+    if not settings.METRICS_DIR:
+        with _lock:
+            return dict(store().values)
+    totals = defaultdict(float)
+    pattern = os.path.join(settings.METRICS_DIR, 'metrics-*.db')
+    for path in glob.glob(pattern):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            continue
+        for key, _, value in read_entries(data):
+            totals[key] += value
+    return totals
+
+
+def family(key):
+    name = key.split('{', 1)[0]
+    for suffix in HISTOGRAM_SUFFIXES:
+        base = name[:-len(suffix)]
+        if name.endswith(suffix) and base in METRICS:
+            return base
+    return name
+
+
+def render():
+    """Текст для /metrics в формате экспозиции Prometheus 0.0.4."""
+    families = defaultdict(list)
+    for key, value in collect().items():
+        families[family(key)].append((key, value))
+    lines = []
+    for name in sorted(families):
+        kind, description = METRICS.get(name, ('untyped', ''))
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for key, value in sorted(families[name]):
+            lines.append(f'{key} {value!r}')
+    return '\n'.join(lines) + '\n'
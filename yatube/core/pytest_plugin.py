@@ -0,0 +1,51 @@
+"""Плагин pytest: бюджеты запросов и поиск N+1 в тестах.
+
+Подключается в conftest.py через pytest_plugins. Запросы считаются только
+в теле теста, без подготовки фикстур.
+
+    @pytest.mark.query_budget(5)
+    def test_index(client): ...
+
+С ключом --nplusone падает любой тест, в котором форма запроса
+повторилась больше NPLUSONE_THRESHOLD раз.
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('querywatch')
+    group.addoption(
+        '--nplusone', action='store_true',
+        help='Проваливать тесты с N+1 запросами к базе.'
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_budget(max_queries): не больше max_queries запросов к базе '
+        'в теле теста.'
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker('query_budget')
+    strict = item.config.getoption('nplusone')
+    if marker is None and not strict:
+        yield
+        return
+
+    from core.querywatch import watch
+
+    with watch() as watcher:
+        outcome = yield
+    if outcome.excinfo is not None:
+        return
+    if marker is not None and watcher.total > marker.args[0]:
+        pytest.fail(
+            f'Запросов к базе: {watcher.total}, бюджет {marker.args[0]}.\n'
+            f'{watcher.report()}', pytrace=False
+        )
+    if strict and watcher.n_plus_one():
+        pytest.fail(f'Похоже на N+1:\n{watcher.report()}', pytrace=False)
@@ -0,0 +1,123 @@
+"""Поиск N+1 и журнал медленных запросов.
+
+QueryWatcher подключается через connection.execute_wrapper и группирует
+выполненный SQL по «форме» — тексту запроса без значений. Одна и та же
+форма, повторённая больше порога за запрос или тест, — признак N+1:
+кто-то обращается к связанному объекту в цикле.
+"""
+import logging
+import os
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+import django
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('core.queries')
+
+IN_LIST_RE = re.compile(r'\bIN \((?:%s, )*%s\)')
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+DJANGO_DIR = os.path.dirname(django.__file__)
+
+
+def normalize(sql):
+    """Форма запроса: без значений и с IN (...) любой длины."""
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return LITERAL_RE.sub('?', sql)
+
+
+def template_line(frames):
+    """Строка шаблона, из которой выполняется запрос, если есть."""
+    for frame, _ in reversed(frames):
+        node = frame.f_locals.get('self')
+        if frame.f_code.co_name == 'render_annotated' and node is not None:
+            token = getattr(node, 'token', None)
+            origin = getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                return f'{origin.name}:{token.lineno}'
+    return None
+
+
+def project_stack():
+    """Кадры стека из кода проекта, без Django и библиотек."""
+    frames = list(traceback.walk_stack(None))[::-1]
+    own = [
+        (frame, lineno) for frame, lineno in frames
+        if not frame.f_code.co_filename.startswith(DJANGO_DIR)
+        and 'site-packages' not in frame.f_code.co_filename
+        and frame.f_code.co_filename != __file__
+    ]
+    return frames, own
+
+
+def describe(frames):
+    frames_all, own = frames
+    lines = [
+        f'{frame.f_code.co_filename}:{lineno} in {frame.f_code.co_name}'
+        for frame, lineno in own[-5:]
+    ]
+    template = template_line(frames_all)
+    if template:
+        lines.append(f'шаблон {template}')
+    return '\n'.join(lines)
+
+
+class QueryWatcher:
+    """Обёртка для execute_wrapper: формы запросов и медленные запросы."""
+
+    def __init__(self, slow_ms=None, threshold=None):
+        self.slow_ms = (settings.SLOW_QUERY_MS
+                        if slow_ms is None else slow_ms)
+        self.threshold = (settings.NPLUSONE_THRESHOLD
+                          if threshold is None else threshold)
+        self.shapes = Counter()
+        self.origins = {}
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.record(sql, duration)
+
+    def record(self, sql, duration):
+        self.total += 1
+        shape = normalize(sql)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == self.threshold + 1:
+            # Стек берётся один раз на форму, когда она стала подозрительной.
+            self.origins[shape] = describe(project_stack())
+        if duration >= self.slow_ms:
+            logger.warning(
+                'Медленный запрос, %.1f мс: %s\n%s',
+                duration, sql, describe(project_stack())
+            )
+
+    def n_plus_one(self):
+        """Формы, повторённые больше порога: [(форма, число)]."""
+        return [
+            (shape, count) for shape, count in self.shapes.most_common()
+            if count > self.threshold
+        ]
+
+    def report(self):
+        return '\n\n'.join(
+            f'{count} раз: {shape}\n{self.origins.get(shape, "")}'
+            for shape, count in self.n_plus_one()
+        )
+
+
+@contextmanager
+def watch(**kwargs):
+    """Следит за запросами ко всем базам внутри блока."""
+    watcher = QueryWatcher(**kwargs)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(watcher))
+        yield watcher
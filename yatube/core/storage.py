@@ -0,0 +1,46 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.xml')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем содержимого в имени и сжатыми копиями .gz рядом.
+
+    Имена с хешем можно отдавать с долгим Cache-Control, а .gz отдаёт
+    сам веб-сервер (gzip_static в nginx) без сжатия на каждый запрос.
+    """
+
+    min_size = 256
+
+    def stored_name(self, name):
+        # Файла нет среди статики — ссылка без хеша вместо ошибки 500.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed.add(hashed_name)
+            yield name, hashed_name, processed
+        if not dry_run:
+            for name in sorted(hashed):
+                self.compress(name)
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        with self.open(name) as source:
+            data = source.read()
+        if len(data) < self.min_size:
+            return
+        compressed = gzip.compress(data, compresslevel=9)
+        if len(compressed) < len(data):
+            with open(self.path(name) + '.gz', 'wb') as target:
+                target.write(compressed)
@@ -0,0 +1,128 @@
+"""Двухуровневый кеш: LRU в памяти процесса (L1) перед общим кешем (L2).
+
+Даже общий кеш — это обращение к нему и распаковка значения на каждый
+запрос. Готовые страницы, которые читают чаще, чем меняют, процесс
+держит у себя в L1 и отдаёт без обращений к L2.
+
+Инвалидация — по поколениям. К ключу дописываются номера поколений,
+от которых зависит значение (например, «посты»); bump() увеличивает
+номер в L2, и записи со старым номером больше не читаются ни из L1,
+ни из L2 любого воркера. Номера читаются из L2 один раз за HTTP-запрос
+(одним get_many), поэтому чужие изменения видны уже в следующем
+запросе. Вне запроса номера читаются при каждом обращении.
+
+Значения из L1 отдаются без копирования: менять их нельзя.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import prometheus
+
+
+def generation_key(name):
+    return f'generation:{name}'
+
+
+def new_generation():
+    # Случайное начало: если ключ поколения пропал из L2 (clear(),
+    # вытеснение), номер не совпадёт с записями, оставшимися в L1.
+    return random.getrandbits(48)
+
+
+class TwoTierCache:
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @property
+    def size(self):
+        return settings.TIERED_CACHE_SIZE
+
+    def start_request(self, **kwargs):
+        self.local.generations = {}
+
+    def finish_request(self, **kwargs):
+        self.local.generations = None
+
+    def generations(self, names):
+        """Текущие номера поколений names."""
+        memo = getattr(self.local, 'generations', None)
+        known = memo if memo is not None else {}
+        missing = [name for name in names if name not in known]
+        if missing:
+            found = cache.get_many([generation_key(name) for name in missing])
+            for name in missing:
+                value = found.get(generation_key(name))
+                if value is None:
+                    cache.add(generation_key(name), new_generation(), None)
+                    value = cache.get(generation_key(name), new_generation())
+                known[name] = value
+        return [known[name] for name in names]
+
+    def bump(self, *names):
+        """Делает устаревшими все записи, зависящие от поколений names."""
+        memo = getattr(self.local, 'generations', None)
+        for name in names:
+            try:
+                value = cache.incr(generation_key(name))
+            except ValueError:
+                value = new_generation()
+                cache.set(generation_key(name), value, None)
+            if memo is not None:
+                memo[name] = value
+
+    def versioned(self, key, generations):
+        if not generations:
+            return key
+        numbers = '.'.join(map(str, self.generations(generations)))
+        return f'{key}@{numbers}'
+
+    def get(self, key, generations=(), default=None):
+        key = self.versioned(key, generations)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                prometheus.inc('yatube_tiered_cache_requests_total',
+                               {'result': 'l1'})
+                return entry[1]
+        entry = cache.get(key)
+        if entry is None or entry[0] <= now:
+            prometheus.inc('yatube_tiered_cache_requests_total',
+                           {'result': 'miss'})
+            return default
+        self.remember(key, *entry)
+        prometheus.inc('yatube_tiered_cache_requests_total',
+                       {'result': 'l2'})
+        return entry[1]
+
+    def set(self, key, value, timeout, generations=()):
+        key = self.versioned(key, generations)
+        # Срок хранится вместе со значением: L1 другого воркера, взяв
+        # запись из L2, не продержит её дольше, чем L2.
+        expires = time.time() + timeout
+        cache.set(key, (expires, value), timeout)
+        self.remember(key, expires, value)
+
+    def remember(self, key, expires, value):
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Очищает только L1 этого процесса."""
+        with self.lock:
+            self.entries.clear()
+
+
+tiered = TwoTierCache()
@@ -1,4 +1,12 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from . import prometheus
+from .metrics import REGISTRY
 
 
 def page_not_found(request, exception):
@@ -21,3 +29,23 @@ def failure(request, exception):
 
 def server_error(request):
     return render(request, 'core/500.html', status=500)
+
+
+@staff_member_required
+def instrumentation(request):
+    """Гистограммы замеров InstrumentationMiddleware по view."""
+    return JsonResponse(REGISTRY.snapshot(), json_dumps_params={'indent': 2})
+
+
+def metrics(request):
+    """Метрики для Prometheus: по токену METRICS_TOKEN и персоналу."""
+    token = request.META.get('HTTP_AUTHORIZATION', '')
+    scraper = bool(settings.METRICS_TOKEN) and constant_time_compare(
+        token, f'Bearer {settings.METRICS_TOKEN}'
+    )
+    if not (scraper or request.user.is_staff):
+        raise PermissionDenied
+    return HttpResponse(
+        prometheus.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
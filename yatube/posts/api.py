@@ -0,0 +1,150 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_GET
+
+from . import timeline
+from .conditional import make_etag, window_versions
+from .models import Group, Post, User
+from .paginator import NEXT, decode_cursor, encode_cursor
+from .views import feed
+
+FIELDS = {
+    'id': lambda post: post.pk,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date,
+    'updated_at': lambda post: post.updated_at,
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group else None,
+    'image': lambda post: post.image.url if post.image else None,
+    'comments_count': lambda post: post.comments_count,
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def parse_fields(request):
+    """Поля из ?fields=id,text; по умолчанию — все."""
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(FIELDS)
+    fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.POSTS_PER_PAGE))
+    except ValueError:
+        raise BadRequest('limit должен быть числом')
+    return min(max(limit, 1), settings.API_MAX_LIMIT)
+
+
+def serialize(post, fields):
+    return json.dumps(
+        {field: FIELDS[field](post) for field in fields},
+        cls=DjangoJSONEncoder, ensure_ascii=False
+    )
+
+
+def stream(posts, fields, next_cursor):
+    yield '{"results": ['
+    for number, post in enumerate(posts.iterator()):
+        if number:
+            yield ','
+        yield serialize(post, fields)
+    yield f'], "next": {json.dumps(next_cursor)}}}'
+
+
+def feed_response(request, posts):
+    """Страница ленты в JSON, отдаётся потоком.
+
+    Сначала одним лёгким запросом читаются id и версии постов окна:
+    по ним считается ETag и курсор следующей страницы, а тексты постов
+    сериализуются только если клиенту нужен ответ целиком.
+    """
+    try:
+        fields = parse_fields(request)
+        limit = parse_limit(request)
+    except BadRequest as error:
+        return JsonResponse({'detail': str(error)}, status=400)
+    cursor = decode_cursor(request.GET.get('cursor'))
+
+    versions = window_versions(posts, cursor, limit)
+    next_cursor = None
+    if len(versions) > limit:
+        versions = versions[:limit]
+        pk, pub_date = versions[-1][:2]
+        number = cursor[3] + 1 if cursor else 2
+        next_cursor = encode_cursor(NEXT, pub_date, pk, number)
+
+    etag = make_etag(versions, fields, next_cursor)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    ids = [version[0] for version in versions]
+    rows = feed(Post.objects.filter(pk__in=ids)).order_by('-pub_date', '-pk')
+    response = StreamingHttpResponse(
+        stream(rows, fields, next_cursor),
+        content_type='application/json; charset=utf-8'
+    )
+    response['ETag'] = etag
+    return response
+
+
+@require_GET
+def index(request):
+    return feed_response(request, Post.objects.all())
+
+
+@require_GET
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, group.posts.all())
+
+
+@require_GET
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_response(request, author.posts.all())
+
+
+@require_GET
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Требуется авторизация'}, status=401)
+    return feed_response(request, timeline.following_posts(request.user))
+
+
+@require_GET
+def post_detail(request, post_id):
+    try:
+        fields = parse_fields(request)
+    except BadRequest as error:
+        return JsonResponse({'detail': str(error)}, status=400)
+    post = get_object_or_404(feed(Post.objects.all()), pk=post_id)
+
+    etag = make_etag(
+        post.pk, post.updated_at, post.comments_count,
+        FIELDS['author'](post), FIELDS['group'](post), fields
+    )
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = JsonResponse(
+        {field: FIELDS[field](post) for field in fields},
+        json_dumps_params={'ensure_ascii': False}
+    )
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,123 @@
+import hashlib
+from datetime import date
+
+from django.conf import settings
+from django.db.models import BooleanField, Exists, OuterRef, Value
+from django.utils.http import quote_etag
+
+from .models import Follow, Group, Post, User
+from .paginator import CursorPaginator, decode_cursor
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def window_versions(posts, cursor, limit):
+    """id и версии постов окна ленты — один запрос по индексу.
+
+    Имя автора и slug группы отдаются в JSON, но меняются без
+    updated_at поста, поэтому тоже входят в версию.
+    """
+    window = CursorPaginator(posts, limit).window(cursor)
+    return list(
+        window.values_list(
+            'pk', 'pub_date', 'updated_at', 'comments_count',
+            'author__username', 'group__slug',
+        )[:limit + 1]
+    )
+
+
+def page_versions(posts, cursor, limit):
+    """id и версии постов страницы — та же выборка по ключу, что и у
+    CursorPaginator.page(), в обе стороны от курсора.
+
+    Группа и имя автора меняются без updated_at поста, но видны в
+    карточке, поэтому тоже входят в версию.
+    """
+    rows = CursorPaginator(posts, limit).rows(cursor)
+    return list(
+        rows.values_list(
+            'pk', 'pub_date', 'updated_at', 'comments_count', 'group_id',
+            'group__slug', 'group__title', 'author__username',
+        )[:limit + 1]
+    )
+
+
+def following(request, author_ref):
+    if not request.user.is_authenticated:
+        return Value(False, output_field=BooleanField())
+    return Exists(Follow.objects.filter(user=request.user, author=author_ref))
+
+
+def page_etag(request, *parts):
+    # Страницы зависят от пользователя (шапка, кнопки) и от года в
+    # подвале.
+    return make_etag(request.user.pk, date.today().year, *parts)
+
+
+def detail_post(request, post_id):
+    """Пост для post_detail одним запросом: автор, его счётчики, группа и
+    подписка. Запоминается на request, чтобы ETag и представление не
+    читали его дважды.
+    """
+    post = getattr(request, '_detail_post', None)
+    if post is None or post.pk != post_id:
+        post = Post.objects.select_related('author__stats', 'group').annotate(
+            is_following=following(request, OuterRef('author'))
+        ).filter(pk=post_id).first()
+        request._detail_post = post
+    return post
+
+
+def post_detail_etag(request, post_id, username=None):
+    post = detail_post(request, post_id)
+    if post is None:
+        return None
+    author = post.author
+    stats = getattr(author, 'stats', None)
+    if stats is not None:
+        stats = (stats.posts_count, stats.followers_count,
+                 stats.following_count)
+    group = post.group
+    if group is not None:
+        group = (group.pk, group.slug, group.title)
+    return page_etag(
+        request, 'post', post_id, post.updated_at, post.comments_count,
+        group, author.username, author.get_full_name(), stats,
+        post.is_following, request.GET.get('comments'),
+        # Форма комментария несёт CSRF-токен: после смены cookie (вход,
+        # выход) старая страница дала бы 403 при отправке.
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+    )
+
+
+def group_posts_etag(request, slug):
+    group = Group.objects.filter(slug=slug).values_list(
+        'pk', 'title', 'description'
+    ).first()
+    if group is None:
+        return None
+    versions = page_versions(
+        Post.objects.filter(group_id=group[0]),
+        decode_cursor(request.GET.get('cursor')),
+        settings.POSTS_PER_PAGE,
+    )
+    return page_etag(request, 'group', group, versions)
+
+
+def profile_etag(request, username):
+    author = User.objects.filter(username=username).annotate(
+        is_following=following(request, OuterRef('pk'))
+    ).values_list(
+        'pk', 'first_name', 'last_name', 'stats__posts_count',
+        'stats__followers_count', 'stats__following_count', 'is_following',
+    ).first()
+    if author is None:
+        return None
+    versions = page_versions(
+        Post.objects.filter(author_id=author[0]),
+        decode_cursor(request.GET.get('cursor')),
+        settings.POSTS_PER_PAGE,
+    )
+    return page_etag(request, 'profile', author, versions)
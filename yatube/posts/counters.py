@@ -0,0 +1,94 @@
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Count, F, IntegerField, OuterRef, Subquery, Value
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, User, UserStats
+
+
+def count_of(model, field):
+    """Подзапрос COUNT(*) строк model, ссылающихся на внешнюю строку."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(total=Count('pk'))
+        .values('total'),
+        output_field=IntegerField()
+    ), 0)
+
+
+def user_counts(users):
+    return users.annotate(
+        posts_total=count_of(Post, 'author'),
+        followers_total=count_of(Follow, 'author'),
+        following_total=count_of(Follow, 'user'),
+    )
+
+
+def build_stats(user):
+    """Считает счётчики пользователя заново и сохраняет их."""
+    counted = user_counts(User.objects.filter(pk=user.pk)).get()
+    stats = UserStats(
+        user=user,
+        posts_count=counted.posts_total,
+        followers_count=counted.followers_total,
+        following_count=counted.following_total,
+    )
+    try:
+        with transaction.atomic():
+            stats.save(force_insert=True)
+    except IntegrityError:
+        # Строку успел создать параллельный запрос.
+        stats = UserStats.objects.get(user=user)
+    return stats
+
+
+def get_stats(user):
+    """Счётчики пользователя; строка создаётся при первом обращении."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return build_stats(user)
+
+
+def bump_user(user_id, **deltas):
+    """Атомарно сдвигает счётчики пользователя через F().
+
+    Если строки ещё нет, ничего не делаем: get_stats() посчитает её
+    целиком, уже с учётом текущего изменения.
+    """
+    UserStats.objects.filter(user_id=user_id).update(**{
+        field: shifted(field, delta) for field, delta in deltas.items()
+    })
+
+
+def bump_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=shifted('comments_count', delta)
+    )
+
+
+def shifted(field, delta):
+    """F(field) + delta, но не меньше нуля: после загрузки без сигналов
+    (bulk_create) счётчик может отставать, а CHECK у положительного поля
+    превратил бы удаление в ошибку 500.
+    """
+    if delta >= 0:
+        return F(field) + delta
+    return Greatest(F(field) + delta, Value(0))
+
+
+def rebuild():
+    """Пересчитывает все счётчики по данным в базе."""
+    with transaction.atomic():
+        Post.objects.update(comments_count=count_of(Comment, 'post'))
+        UserStats.objects.all().delete()
+        UserStats.objects.bulk_create(
+            UserStats(
+                user_id=user.pk,
+                posts_count=user.posts_total,
+                followers_count=user.followers_total,
+                following_count=user.following_total,
+            )
+            for user in user_counts(User.objects.all()).iterator()
+        )
@@ -0,0 +1,56 @@
+from django.conf import settings
+
+from core import prometheus
+from core.db.routers import primary_pinned
+from core.tiered import tiered
+
+from .paginator import decode_cursor, encode_cursor
+
+INDEX = 'index'
+GROUP = 'group'
+PROFILE = 'profile'
+FOLLOW = 'follow'
+
+# Поколения кеша: POSTS растёт при изменении постов и комментариев,
+# FOLLOWS — при подписке и отписке.
+POSTS = 'posts'
+FOLLOWS = 'follows'
+
+
+def page_key(feed, scope, cursor):
+    # Ключ — из разобранного курсора: битый токен показывает первую
+    # страницу и не должен заводить для неё отдельную запись.
+    position = decode_cursor(cursor)
+    token = encode_cursor(*position) if position else ''
+    return f'posts:feed:{feed}:{scope}:{token}'
+
+
+def get_page(feed, cursor, build, scope='', generations=(POSTS,)):
+    """Готовая страница ленты из кеша; на промахе строится через build().
+
+    В кеше лежит уже вычисленная страница (строки постов и курсоры),
+    поэтому на попадании ленте не нужно ни одного запроса к базе, а на
+    попадании в L1 — и обращения к общему кешу. scope отделяет ленты
+    одного вида (группа, автор), generations — от чего зависит страница.
+
+    Запрос, закреплённый за основной базой после записи, кеш не читает и
+    не пишет: в кеше может лежать страница, собранная по реплике.
+    """
+    if primary_pinned():
+        return build()
+    key = page_key(feed, scope, cursor)
+    page = tiered.get(key, generations)
+    prometheus.inc('yatube_feed_cache_requests_total', {
+        'feed': feed, 'result': 'miss' if page is None else 'hit',
+    })
+    if page is None:
+        page = build()
+        tiered.set(key, page, settings.FEED_CACHE_TIMEOUT, generations)
+    return page
+
+
+def invalidate(*generations):
+    """Все закешированные страницы, зависящие от generations, устаревают
+    во всех воркерах. По умолчанию — от постов.
+    """
+    tiered.bump(*(generations or (POSTS,)))
@@ -0,0 +1,12 @@
+"""Общее для команд замеров bench_*."""
+import math
+
+
+class Rollback(Exception):
+    """Выход из transaction.atomic(), чтобы откатить данные замера."""
+
+
+def percentile(values, share):
+    """Перцентиль по ближайшему рангу: share=0.95 — p95."""
+    values = sorted(values)
+    return values[max(math.ceil(share * len(values)) - 1, 0)]
@@ -0,0 +1,86 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from posts import urls
+from posts.management.bench import Rollback, percentile
+from posts.models import Group, Post, UserStats
+
+CONVERTER_RE = re.compile(r'<(?:\w+:)?(\w+)>')
+
+
+class Command(BaseCommand):
+    help = ('Обходит все адреса posts/urls.py тестовым клиентом и печатает '
+            'p50/p95 времени ответа и число запросов; изменения '
+            'откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.measure(options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def sample(self):
+        """Самый популярный автор, самый активный читатель и их данные."""
+        stats = UserStats.objects.select_related('user')
+        author = stats.order_by('-followers_count').first()
+        reader = stats.exclude(pk=getattr(author, 'pk', None)).order_by(
+            '-following_count'
+        ).first()
+        post = Post.objects.order_by('-comments_count').first()
+        group = Group.objects.order_by('pk').first()
+        if not (author and reader and post and group):
+            raise CommandError('База пуста: сначала запустите seed_load.')
+        return reader.user, {
+            'username': author.user.username,
+            'post_id': post.pk,
+            'slug': group.slug,
+        }, post.text.split()[0]
+
+    def routes(self, values):
+        seen = set()
+        for pattern in urls.urlpatterns:
+            if not getattr(pattern, 'name', None):
+                continue
+            path = '/' + CONVERTER_RE.sub(
+                lambda match: str(values[match.group(1)]),
+                str(pattern.pattern)
+            )
+            if path not in seen:
+                seen.add(path)
+                yield pattern.name, path
+
+    def measure(self, repeat):
+        reader, values, word = self.sample()
+        client = Client()
+        client.force_login(reader)
+        params = {'search': {'q': word}}
+
+        self.stdout.write(
+            f'{"адрес":<40} {"код":>4} {"p50, мс":>9} {"p95, мс":>9} '
+            f'{"запросы":>8}'
+        )
+        for name, path in self.routes(values):
+            timings = []
+            queries = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = client.get(path, params.get(name))
+                    timings.append(time.perf_counter() - started)
+                queries.append(len(captured))
+            self.stdout.write(
+                f'{path:<40} {response.status_code:>4} '
+                f'{percentile(timings, 0.5) * 1000:9.2f} '
+                f'{percentile(timings, 0.95) * 1000:9.2f} '
+                f'{percentile(queries, 0.5):8}'
+            )
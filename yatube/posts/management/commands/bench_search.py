@@ -0,0 +1,82 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.management.bench import Rollback
+from posts.models import Post
+from posts.search import IContainsBackend, SQLiteFTSBackend
+
+WORDS = (
+    'лето зима осень весна город море река лес поле гора дорога дом '
+    'книга музыка кино театр друг кошка собака утро вечер ночь день '
+    'работа отпуск поезд самолёт погода дождь снег солнце ветер'
+).split()
+# Редкое слово: на таких запросах LIKE вынужден читать всю таблицу.
+RARE_WORD = 'маяк'
+RARE_EVERY = 1000
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает FTS5 и icontains на синтетических постах; '
+            'данные откатываются после замера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--batch', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('queries', nargs='*',
+                            default=['море', 'гор*', RARE_WORD, 'маяк гор*'])
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.fill(options['posts'], options['batch'])
+                self.measure(options['queries'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def fill(self, total, batch):
+        author, _ = get_user_model().objects.get_or_create(
+            username='bench_search'
+        )
+        started = time.perf_counter()
+        for offset in range(0, total, batch):
+            Post.objects.bulk_create(
+                Post(text=self.text(offset + i), author=author)
+                for i in range(min(batch, total - offset))
+            )
+        SQLiteFTSBackend().rebuild()
+        self.stdout.write(
+            f'Создано постов: {total} '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
+
+    def text(self, number):
+        words = random.choices(WORDS, k=30)
+        if number % RARE_EVERY == 0:
+            words.append(RARE_WORD)
+        return ' '.join(words)
+
+    def measure(self, queries, repeat):
+        backends = {
+            'fts5': SQLiteFTSBackend(),
+            'icontains': IContainsBackend(),
+        }
+        for query in queries:
+            for name, backend in backends.items():
+                # icontains не понимает префиксный синтаксис FTS.
+                text = query.rstrip('*') if name == 'icontains' else query
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    backend.search(text, 0, 10)
+                    timings.append(time.perf_counter() - started)
+                self.stdout.write(
+                    f'{name:<10} {query!r:<16} '
+                    f'лучшее {min(timings) * 1000:8.2f} мс, '
+                    f'среднее {sum(timings) / repeat * 1000:8.2f} мс'
+                )
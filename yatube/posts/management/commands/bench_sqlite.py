@@ -0,0 +1,135 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+
+from posts.management.bench import percentile
+from posts.models import Comment, Post, User
+
+# Поведение SQLite по умолчанию: журнал отката, полная синхронизация.
+BASELINE = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+class Command(BaseCommand):
+    help = ('Нагрузка на копию базы SQLite читателями ленты и писателями '
+            'постов: журнал по умолчанию против SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=10)
+
+    def handle(self, *args, **options):
+        source = connections['default']
+        if source.vendor != 'sqlite':
+            raise CommandError('Замер только для SQLite.')
+        directory = tempfile.mkdtemp()
+        try:
+            for profile, pragmas in (
+                ('default', BASELINE),
+                ('tuned', settings.SQLITE_PRAGMAS),
+            ):
+                alias = self.copy(source, directory, profile, pragmas)
+                try:
+                    self.report(profile, self.run(alias, options))
+                finally:
+                    connections[alias].close()
+                    del connections.databases[alias]
+        finally:
+            shutil.rmtree(directory)
+
+    def copy(self, source, directory, profile, pragmas):
+        """Копия базы в отдельный файл, подключённая как новая база."""
+        path = os.path.join(directory, f'{profile}.sqlite3')
+        source.ensure_connection()
+        target = sqlite3.connect(path)
+        source.connection.backup(target)
+        target.close()
+        alias = f'bench_{profile}'
+        connections.databases[alias] = {
+            **source.settings_dict, 'NAME': path, 'PRAGMAS': pragmas,
+            'ENGINE': 'django.db.backends.sqlite3', 'CONN_MAX_AGE': 0,
+        }
+        return alias
+
+    def run(self, alias, options):
+        author = User.objects.using(alias).order_by('pk').first()
+        if author is None:
+            author = User.objects.db_manager(alias).create(
+                username='bench_sqlite'
+            )
+        stop = threading.Event()
+        results = []
+        lock = threading.Lock()
+
+        def worker(action):
+            latencies = []
+            errors = 0
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        action(alias, author)
+                    except OperationalError:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connections[alias].close()
+            with lock:
+                results.append((action, latencies, errors))
+
+        threads = [
+            threading.Thread(target=worker, args=(self.read,))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=(self.write,))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return results, options['seconds']
+
+    def read(self, alias, author):
+        list(
+            Post.objects.using(alias).select_related('author', 'group')
+            .order_by('-pub_date', '-pk')[:10]
+        )
+
+    def write(self, alias, author):
+        # bulk_create: без сигналов, которые пишут в основную базу.
+        Post.objects.using(alias).bulk_create([
+            Post(text='Нагрузка', author_id=author.pk)
+        ])
+        post_id = Post.objects.using(alias).values_list(
+            'pk', flat=True
+        ).latest('pk')
+        Comment.objects.using(alias).bulk_create([
+            Comment(post_id=post_id, author_id=author.pk, text='Нагрузка')
+        ])
+
+    def report(self, profile, run):
+        results, seconds = run
+        for action, title in ((self.read, 'чтение'), (self.write, 'запись')):
+            latencies = [
+                latency for kind, values, _ in results if kind == action
+                for latency in values
+            ]
+            errors = sum(
+                count for kind, _, count in results if kind == action
+            )
+            p95 = percentile(latencies, 0.95) * 1000 if latencies else 0
+            self.stdout.write(
+                f'{profile:<8} {title:<7} {len(latencies) / seconds:9.0f} '
+                f'оп/с, p95 {p95:7.2f} мс, ошибок блокировки {errors}'
+            )
@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+
+from posts.models import Post
+from posts.views import feed, paginate
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время рендера шаблона ленты с кеширующим '
+            'загрузчиком шаблонов и без него.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=500)
+        parser.add_argument('--template', default='posts/index.html')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        # Страница вычисляется один раз: замеряем шаблоны, а не базу.
+        context = {'page_obj': paginate(request, feed(Post.objects.all()))}
+
+        results = {}
+        for title, loaders in (
+            ('без кеша', settings.TEMPLATE_LOADERS),
+            ('cached', [('django.template.loaders.cached.Loader',
+                         settings.TEMPLATE_LOADERS)]),
+        ):
+            backend = self.backend(loaders)
+            backend.get_template(options['template'])
+            timings = []
+            for _ in range(options['renders']):
+                started = time.perf_counter()
+                backend.get_template(options['template']).render(
+                    context, request
+                )
+                timings.append(time.perf_counter() - started)
+            results[title] = statistics.median(timings) * 1000
+            self.stdout.write(
+                f'{title:<9} медиана {results[title]:7.3f} мс на рендер'
+            )
+        saved = results['без кеша'] - results['cached']
+        self.stdout.write(
+            f'экономия {saved:.3f} мс '
+            f'({saved / results["без кеша"] * 100:.0f}%) на рендер'
+        )
+
+    def backend(self, loaders):
+        base = settings.TEMPLATES[0]
+        return DjangoTemplates({
+            'NAME': 'bench',
+            'DIRS': base['DIRS'],
+            'APP_DIRS': False,
+            'OPTIONS': {**base['OPTIONS'], 'loaders': loaders, 'debug': False},
+        })
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from posts.models import Post
+from posts.thumbnails import generate, generate_in_worker
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры для уже загруженных картинок постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков; 0 — строить в текущем потоке.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить и уже готовые миниатюры.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            posts = posts.filter(Q(thumbnail='') | Q(thumbnail__isnull=True))
+        posts = posts.order_by('pk').values_list('pk', flat=True)
+
+        built = 0
+        last_id = 0
+        pool = None
+        if options['workers']:
+            pool = ThreadPoolExecutor(max_workers=options['workers'])
+        try:
+            while True:
+                batch = list(posts.filter(pk__gt=last_id)[:BATCH_SIZE])
+                if not batch:
+                    break
+                last_id = batch[-1]
+                if pool:
+                    names = pool.map(generate_in_worker, batch)
+                else:
+                    names = map(generate, batch)
+                built += sum(1 for name in names if name)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f'Построено миниатюр: {built}'))
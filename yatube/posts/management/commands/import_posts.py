@@ -0,0 +1,260 @@
+import csv
+import json
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import counters, feed_cache
+from posts.models import Comment, Group, Post, User
+from posts.search import get_backend
+
+MODELS = {
+    'post': (Post, 'pub_date'),
+    'comment': (Comment, 'created'),
+}
+
+
+@contextmanager
+def keep_dates(model):
+    """Отключает auto_now/auto_now_add, чтобы сохранить даты из файла."""
+    fields = [
+        field for field in model._meta.get_fields()
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def read_rows(stream, file_format):
+    """Строки файла как словари; вместо битой строки JSON — None."""
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Загружает посты или комментарии из JSONL/CSV пачками '
+            'через bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл JSONL/CSV или - для stdin.')
+        parser.add_argument('--model', choices=MODELS, default='post')
+        parser.add_argument('--format', choices=('jsonl', 'csv'))
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Создавать отсутствующих авторов без пароля.'
+        )
+        parser.add_argument(
+            '--no-rebuild', action='store_true',
+            help='Не пересчитывать счётчики и поисковый индекс.'
+        )
+
+    def handle(self, *args, **options):
+        self.model, self.date_field = MODELS[options['model']]
+        self.create_authors = options['create_authors']
+        self.authors = {}
+        self.groups = {}
+        self.skipped = 0
+        self.explicit_ids = False
+
+        file_format = options['format'] or (
+            'csv' if options['path'].endswith('.csv') else 'jsonl'
+        )
+        if options['path'] == '-':
+            stream = sys.stdin
+        else:
+            try:
+                stream = open(options['path'], encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(error)
+
+        loaded = 0
+        started = time.perf_counter()
+        rows = read_rows(stream, file_format)
+        try:
+            with keep_dates(self.model):
+                while True:
+                    batch = list(islice(rows, options['batch_size']))
+                    if not batch:
+                        break
+                    loaded += self.load(batch)
+                    self.report(loaded, started)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if self.explicit_ids:
+                self.reset_sequence()
+            # Загруженные до ошибки пачки уже в базе: счётчики, индекс и
+            # кеш лент пересчитываются и при прерванной загрузке.
+            if not options['no_rebuild']:
+                counters.rebuild()
+                get_backend().rebuild()
+            feed_cache.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено: {loaded}, пропущено: {self.skipped}'
+        ))
+
+    def reset_sequence(self):
+        """После вставки с явными id сдвигает последовательность (PostgreSQL),
+        иначе следующий пост получил бы уже занятый id.
+        """
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [self.model]
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def report(self, loaded, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{loaded} строк, {loaded / elapsed:.0f} строк/с', ending='\r'
+        )
+
+    def resolve_authors(self, batch):
+        missing = {
+            row['author'] for row in batch
+            if row and row.get('author')
+            and row['author'] not in self.authors
+        }
+        if not missing:
+            return
+        self.authors.update(
+            User.objects.filter(username__in=missing)
+            .values_list('username', 'pk')
+        )
+        missing -= set(self.authors)
+        if missing and self.create_authors:
+            password = make_password(None)
+            User.objects.bulk_create(
+                User(username=username, password=password)
+                for username in missing
+            )
+            self.authors.update(
+                User.objects.filter(username__in=missing)
+                .values_list('username', 'pk')
+            )
+
+    def resolve_groups(self, batch):
+        missing = {
+            row['group'] for row in batch
+            if row and row.get('group') and row['group'] not in self.groups
+        }
+        if missing:
+            self.groups.update(
+                Group.objects.filter(slug__in=missing)
+                .values_list('slug', 'pk')
+            )
+
+    def resolve_ids(self, batch):
+        """Какие id из пачки уже заняты в базе и на какие из постов
+        комментариев есть что ссылаться.
+        """
+        ids = {to_int(row.get('id')) for row in batch if row}
+        self.existing = set(
+            self.model.objects.filter(pk__in=ids - {None})
+            .values_list('pk', flat=True)
+        )
+        self.posts = set()
+        if self.model is Comment:
+            post_ids = {to_int(row.get('post')) for row in batch if row}
+            self.posts = set(
+                Post.objects.filter(pk__in=post_ids - {None})
+                .values_list('pk', flat=True)
+            )
+
+    def build(self, row):
+        if row is None:
+            return None
+        author_id = self.authors.get(row.get('author'))
+        date = self.parse_date(row.get(self.date_field))
+        if author_id is None or date is None or not row.get('text'):
+            return None
+        fields = {
+            'author_id': author_id,
+            'text': row['text'],
+            self.date_field: date,
+        }
+        if self.model is Post:
+            if row.get('group') and row['group'] not in self.groups:
+                return None
+            fields['group_id'] = self.groups.get(row.get('group'))
+            fields['updated_at'] = date
+            fields['image'] = row.get('image') or None
+        else:
+            fields['post_id'] = to_int(row.get('post'))
+            if fields['post_id'] not in self.posts:
+                return None
+        if row.get('id'):
+            fields['pk'] = self.new_pk(row['id'])
+            if fields['pk'] is None:
+                return None
+        return self.model(**fields)
+
+    @staticmethod
+    def parse_date(value):
+        try:
+            date = parse_datetime(value or '')
+        except (TypeError, ValueError):
+            # Формат даты верный, но такой даты нет: 2020-13-01.
+            return None
+        if date is not None and timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
+
+    def new_pk(self, value):
+        """id из файла, если он ещё не занят; повтор в файле — тоже занят."""
+        pk = to_int(value)
+        if pk is None or pk in self.existing:
+            return None
+        self.existing.add(pk)
+        self.explicit_ids = True
+        return pk
+
+    def load(self, batch):
+        with transaction.atomic():
+            self.resolve_authors(batch)
+            if self.model is Post:
+                self.resolve_groups(batch)
+            self.resolve_ids(batch)
+            objects = []
+            for row in batch:
+                obj = self.build(row)
+                if obj is None:
+                    self.skipped += 1
+                else:
+                    objects.append(obj)
+            self.model.objects.bulk_create(objects)
+        return len(objects)
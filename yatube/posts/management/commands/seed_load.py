@@ -0,0 +1,177 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from faker import Faker
+
+from posts import counters, feed_cache
+from posts.management.commands.import_posts import keep_dates
+from posts.models import Comment, Follow, Group, Post, User
+from posts.search import get_backend
+
+# Показатель закона Ципфа для популярности авторов и Парето для числа
+# подписок: немногие авторы собирают большую часть подписчиков.
+ZIPF_EXPONENT = 1.1
+PARETO_ALPHA = 2
+TEXTS = 2000
+
+
+def zipf_weights(count):
+    return list(accumulate(
+        1 / (rank + 1) ** ZIPF_EXPONENT for rank in range(count)
+    ))
+
+
+def inserted_range(model, before):
+    """id записей, созданных после before; пустой range, если их нет."""
+    bounds = model.objects.filter(pk__gt=before).aggregate(
+        first=Min('pk'), last=Max('pk')
+    )
+    if bounds['first'] is None:
+        return range(0)
+    return range(bounds['first'], bounds['last'] + 1)
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, постами, '
+            'комментариями и подписками для нагрузочных замеров.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.'
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch', type=int, default=10_000)
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        # Авторы берутся только из созданных пользователей, посты для
+        # комментариев — из созданных постов.
+        if options['posts'] and not options['users']:
+            raise CommandError('Для постов нужен хотя бы один пользователь.')
+        if options['comments'] and not options['posts']:
+            raise CommandError('Для комментариев нужен хотя бы один пост.')
+        self.random = random.Random(options['seed'])
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        # Faker медленный: тексты генерируются один раз и переиспользуются.
+        self.texts = [fake.paragraph(nb_sentences=3) for _ in range(TEXTS)]
+        self.batch = options['batch']
+        self.now = timezone.now()
+        self.days = options['days']
+
+        self.step('Пользователи', self.seed_users, options['users'])
+        self.weights = zipf_weights(len(self.users))
+        self.step('Группы', self.seed_groups, options['groups'])
+        self.step('Посты', self.seed_posts, options['posts'])
+        self.step('Комментарии', self.seed_comments, options['comments'])
+        self.step('Подписки', self.seed_follows, options['follows'])
+        self.step('Счётчики и индекс', self.rebuild)
+        self.stdout.write(self.style.SUCCESS('Данные созданы'))
+
+    def step(self, title, func, *args):
+        started = time.perf_counter()
+        func(*args)
+        self.stdout.write(
+            f'{title}: {time.perf_counter() - started:.1f} с'
+        )
+
+    def insert(self, model, total, build):
+        for offset in range(0, total, self.batch):
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    build(offset + i)
+                    for i in range(min(self.batch, total - offset))
+                )
+
+    def authors(self, count):
+        return self.random.choices(
+            self.users, cum_weights=self.weights, k=count
+        )
+
+    def date(self):
+        return self.now - timedelta(
+            seconds=self.random.randrange(self.days * 86400)
+        )
+
+    def seed_users(self, total):
+        before = User.objects.aggregate(last=Max('pk'))['last'] or 0
+        password = make_password(None)
+        self.insert(User, total, lambda number: User(
+            username=f'load_{before + number}', password=password
+        ))
+        self.users = inserted_range(User, before)
+
+    def seed_groups(self, total):
+        before = Group.objects.aggregate(last=Max('pk'))['last'] or 0
+        self.insert(Group, total, lambda number: Group(
+            title=f'Группа {before + number}',
+            slug=f'load-{before + number}',
+            description=self.random.choice(self.texts),
+        ))
+        self.groups = inserted_range(Group, before)
+
+    def seed_posts(self, total):
+        before = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+
+        def build(number):
+            date = self.date()
+            return Post(
+                author_id=self.authors(1)[0],
+                group_id=(self.random.choice(self.groups)
+                          if self.groups and self.random.random() < 0.5
+                          else None),
+                text=self.random.choice(self.texts),
+                pub_date=date,
+                updated_at=date,
+            )
+
+        with keep_dates(Post):
+            self.insert(Post, total, build)
+        self.posts = inserted_range(Post, before)
+
+    def seed_comments(self, total):
+        def build(number):
+            return Comment(
+                post_id=self.random.choice(self.posts),
+                author_id=self.authors(1)[0],
+                text=self.random.choice(self.texts),
+                created=self.date(),
+            )
+
+        with keep_dates(Comment):
+            self.insert(Comment, total, build)
+
+    def seed_follows(self, mean):
+        # Среднее распределения Парето с минимумом 1 — alpha / (alpha - 1).
+        scale = mean * (PARETO_ALPHA - 1) / PARETO_ALPHA
+        batch = []
+        for user_id in self.users:
+            degree = int(self.random.paretovariate(PARETO_ALPHA) * scale)
+            degree = min(degree, len(self.users) - 1)
+            authors = set(self.authors(degree)) - {user_id}
+            batch.extend(
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in authors
+            )
+            if len(batch) >= self.batch:
+                Follow.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        Follow.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def rebuild(self):
+        # bulk_create не отправляет сигналы.
+        counters.rebuild()
+        get_backend().rebuild()
+        feed_cache.invalidate()
@@ -34,6 +34,12 @@ class Post(models.Model):
         auto_now_add=True
     )
 
+    # Версия для ключей кеша карточки поста (includes/post_item.html).
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -57,14 +63,86 @@ class Post(models.Model):
         null=True
     )
 
+    thumbnail = models.ImageField(
+        'Миниатюра',
+        blank=True,
+        null=True,
+        editable=False
+    )
+
+    comments_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False
+    )
+
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # Ленты листаются по ключу (pub_date, id), см. posts.paginator.
+        indexes = (
+            models.Index(fields=['pub_date', 'id'],
+                         name='post_pub_date_idx'),
+            models.Index(fields=['author', 'pub_date', 'id'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', 'pub_date', 'id'],
+                         name='post_group_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.text[:15]
 
+    def srcset(self, image_format):
+        # Варианты берутся из prefetch_related('image_variants') ленты
+        # и сортируются здесь: ORDER BY по списку постов шёл бы через
+        # временное B-дерево.
+        variants = sorted(
+            (variant for variant in self.image_variants.all()
+             if variant.format == image_format),
+            key=lambda variant: variant.width
+        )
+        return ', '.join(
+            f'{variant.image.url} {variant.width}w' for variant in variants
+        )
+
+    @property
+    def jpeg_srcset(self):
+        return self.srcset(PostImageVariant.JPEG)
+
+    @property
+    def webp_srcset(self):
+        return self.srcset(PostImageVariant.WEBP)
+
+
+class PostImageVariant(models.Model):
+    """Готовая миниатюра картинки поста определённой ширины и формата."""
+    JPEG = 'jpeg'
+    WEBP = 'webp'
+    FORMATS = (
+        (JPEG, 'JPEG'),
+        (WEBP, 'WebP'),
+    )
+
+    post = models.ForeignKey(Post,
+                             on_delete=models.CASCADE,
+                             related_name='image_variants')
+
+    width = models.PositiveIntegerField('Ширина')
+
+    format = models.CharField('Формат', max_length=4, choices=FORMATS)
+
+    image = models.ImageField('Файл')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=['post', 'format', 'width'],
+                                    name='uniq_image_variant'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id} {self.format} {self.width}w'
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post,
@@ -82,6 +160,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-created',)
+        indexes = (
+            models.Index(fields=['post', 'created', 'id'],
+                         name='comment_post_created_idx'),
+        )
 
     def __str__(self):
         return self.text[:15]
@@ -104,3 +186,24 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user}'
+
+
+class UserStats(models.Model):
+    """Счётчики пользователя, обновляются сигналами."""
+    user = models.OneToOneField(User,
+                                on_delete=models.CASCADE,
+                                primary_key=True,
+                                related_name='stats')
+
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчики пользователя'
+        verbose_name_plural = 'Счётчики пользователей'
+
+    def __str__(self):
+        return f'{self.user}'
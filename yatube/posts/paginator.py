@@ -0,0 +1,116 @@
+import base64
+import binascii
+import json
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(direction, value, pk, number):
+    """Упаковывает позицию в ленте в непрозрачный токен."""
+    raw = json.dumps([direction, value.isoformat(), pk, number])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен, для битого токена возвращает None."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, value, pk, number = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+        value = parse_datetime(value)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if (
+        direction not in (NEXT, PREVIOUS)
+        or value is None
+        or not isinstance(pk, int)
+        or not isinstance(number, int)
+        or number < 1
+    ):
+        return None
+    return direction, value, pk, number
+
+
+class CursorPaginator(Paginator):
+    """Постраничный вывод по ключу (field, id) без COUNT(*) и OFFSET.
+
+    Страница выбирается по токену курсора, а не по номеру, поэтому любая
+    страница стоит одного индексного запроса. У страницы есть атрибуты
+    next_cursor и previous_cursor; has_next() и num_pages по-прежнему
+    требуют COUNT(*), в шаблонах их не используем.
+    """
+
+    def __init__(self, object_list, per_page, field='pub_date'):
+        super().__init__(object_list, per_page)
+        self.field = field
+
+    def __getstate__(self):
+        # В кеш кладём страницу, а не исходный QuerySet: иначе pickle
+        # вычислит всю таблицу целиком.
+        state = self.__dict__.copy()
+        state['object_list'] = None
+        return state
+
+    def get_page(self, cursor):
+        return self.page(decode_cursor(cursor))
+
+    def window(self, cursor):
+        """Строки после курсора от новых к старым, ещё без LIMIT."""
+        field = self.field
+        rows = self.object_list
+        if cursor is not None:
+            direction, value, pk, number = cursor
+            rows = rows.filter(
+                Q(**{f'{field}__lt': value})
+                | Q(**{field: value, 'pk__lt': pk})
+            )
+        return rows.order_by(f'-{field}', '-pk')
+
+    def rows(self, cursor):
+        """Строки страницы по курсору в порядке выборки, ещё без LIMIT:
+        для курсора назад — от старых к новым.
+        """
+        if cursor is None or cursor[0] == NEXT:
+            return self.window(cursor)
+        field = self.field
+        direction, value, pk, number = cursor
+        return self.object_list.filter(
+            Q(**{f'{field}__gt': value})
+            | Q(**{field: value, 'pk__gt': pk})
+        ).order_by(field, 'pk')
+
+    def page(self, cursor):
+        field = self.field
+        number = 1 if cursor is None else cursor[3]
+        direction = NEXT if cursor is None else cursor[0]
+
+        rows = list(self.rows(cursor)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+            if not has_more:
+                number = 1
+
+        page = Page(rows, number, self)
+        page.next_cursor = None
+        page.previous_cursor = None
+        if rows and (has_more or direction == PREVIOUS):
+            last = rows[-1]
+            page.next_cursor = encode_cursor(
+                NEXT, getattr(last, field), last.pk, number + 1
+            )
+        if rows and number > 2:
+            first = rows[0]
+            page.previous_cursor = encode_cursor(
+                PREVIOUS, getattr(first, field), first.pk, number - 1
+            )
+        return page
@@ -0,0 +1,109 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+WORD_RE = re.compile(r'(\w+)(\*?)')
+
+
+class SearchBackend:
+    """Интерфейс поиска по текстам постов."""
+
+    def index(self, post):
+        """Добавляет или обновляет пост в индексе."""
+
+    def remove(self, post_id):
+        """Убирает пост из индекса."""
+
+    def rebuild(self):
+        """Строит индекс заново по всем постам."""
+
+    def filter(self, posts, query):
+        """Оставляет в QuerySet только посты, подходящие под запрос."""
+        raise NotImplementedError
+
+    def search(self, query, offset, limit):
+        """id найденных постов, от самых подходящих."""
+        raise NotImplementedError
+
+
+class IContainsBackend(SearchBackend):
+    """Поиск LIKE %q% без индекса; годится для любой базы."""
+
+    def filter(self, posts, query):
+        return posts.filter(text__icontains=query)
+
+    def search(self, query, offset, limit):
+        posts = self.filter(Post.objects.all(), query)
+        return list(
+            posts.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)[offset:offset + limit]
+        )
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Инвертированный индекс FTS5 в SQLite, ранжирование по bm25.
+
+    Слово, оканчивающееся на *, ищется как префикс: «прив*».
+    """
+
+    def match(self, query):
+        terms = [
+            f'"{word}"{star}' for word, star in WORD_RE.findall(query)
+        ]
+        return ' '.join(terms)
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text]
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                f'SELECT id, text FROM {Post._meta.db_table}'
+            )
+
+    def filter(self, posts, query):
+        match = self.match(query)
+        if not match:
+            return posts.none()
+        return posts.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [match]
+        ))
+
+    def search(self, query, offset, limit):
+        match = self.match(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                [match, limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def get_backend():
+    """Бэкенд поиска из настройки SEARCH_BACKEND."""
+    return import_string(settings.SEARCH_BACKEND)()
@@ -0,0 +1,126 @@
+import json
+
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+
+
+class FeedApiTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test_slug',
+            description='Тестовое описание группы',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.author, group=cls.group)
+            for i in range(15)
+        )
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_json(self, url, client=None, **params):
+        response = (client or self.guest_client).get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, json.loads(b''.join(response.streaming_content))
+
+    def test_feeds_stream_all_posts_by_cursor(self):
+        """Ленты API отдают все посты по курсору."""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list',
+                    kwargs={'slug': self.group.slug}),
+            reverse('posts:api_profile',
+                    kwargs={'username': self.author.username}),
+            reverse('posts:api_follow_index'),
+        )
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                _, first = self.get_json(url, self.authorized_client,
+                                         limit=10)
+                _, second = self.get_json(url, self.authorized_client,
+                                          limit=10, cursor=first['next'])
+                ids = [post['id'] for post in first['results']
+                       + second['results']]
+                self.assertEqual(ids, expected)
+                self.assertIsNone(second['next'])
+
+    def test_sparse_fieldsets(self):
+        """?fields= ограничивает набор полей."""
+        _, data = self.get_json(reverse('posts:api_index'),
+                                fields='id,author')
+        self.assertEqual(set(data['results'][0]), {'id', 'author'})
+
+        response = self.guest_client.get(reverse('posts:api_index'),
+                                         {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag_returns_not_modified(self):
+        """Повторный запрос с тем же ETag получает 304."""
+        url = reverse('posts:api_index')
+        response, _ = self.get_json(url)
+        etag = response['ETag']
+
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Post.objects.create(text='Новый пост', author=self.author)
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_tracks_group_slug_and_author(self):
+        """Новый slug группы или имя автора — ответ заново, не 304."""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_post_detail',
+                    kwargs={'post_id': self.post.pk}),
+        )
+        changes = (
+            lambda: Group.objects.filter(pk=self.group.pk).update(
+                slug='new_slug'
+            ),
+            lambda: User.objects.filter(pk=self.author.pk).update(
+                username='ivan_new'
+            ),
+        )
+        for change in changes:
+            etags = {url: self.guest_client.get(url)['ETag'] for url in urls}
+            change()
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etags[url]
+                    )
+                    self.assertEqual(response.status_code, 200)
+
+    def test_post_detail(self):
+        """Пост отдаётся в JSON с ETag."""
+        url = reverse('posts:api_post_detail',
+                      kwargs={'post_id': self.post.pk})
+        response = self.guest_client.get(url, {'fields': 'id,text'})
+        self.assertEqual(response.json(),
+                         {'id': self.post.pk, 'text': self.post.text})
+        response = self.guest_client.get(
+            url, {'fields': 'id,text'}, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_follow_requires_login(self):
+        """Лента подписок API недоступна анониму."""
+        response = self.guest_client.get(reverse('posts:api_follow_index'))
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,137 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test_slug',
+            description='Тестовое описание группы',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст поста', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = {
+            'post_detail': reverse(
+                'posts:post_detail',
+                kwargs={'username': self.author.username,
+                        'post_id': self.post.pk}
+            ),
+            'group_list': reverse('posts:group_list',
+                                  kwargs={'slug': self.group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': self.author.username}),
+        }
+        # Первый просмотр создаёт строку счётчиков автора.
+        self.etags()
+
+    def etags(self, client=None):
+        client = client or self.authorized_client
+        return {name: client.get(url)['ETag']
+                for name, url in self.urls.items()}
+
+    def assert_status(self, etags, status, client=None):
+        client = client or self.authorized_client
+        for name, url in self.urls.items():
+            with self.subTest(url=url):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[name])
+                self.assertEqual(response.status_code, status)
+
+    def test_unchanged_pages_return_not_modified(self):
+        """Неизменённые страницы отвечают 304 за пару запросов к базе."""
+        etags = self.etags()
+        self.assert_status(etags, 304)
+        with self.assertNumQueries(4):
+            self.authorized_client.get(
+                self.urls['profile'],
+                HTTP_IF_NONE_MATCH=etags['profile']
+            )
+
+    def test_changes_refresh_etag(self):
+        """Новый пост, комментарий и подписка меняют ETag."""
+        changes = (
+            lambda: Post.objects.create(
+                text='Новый пост', author=self.author, group=self.group
+            ),
+            lambda: Comment.objects.create(
+                post=self.post, author=self.user, text='Комментарий'
+            ),
+            lambda: Follow.objects.create(user=self.user,
+                                          author=self.author),
+        )
+        for change in changes:
+            etags = self.etags()
+            change()
+            response = self.authorized_client.get(
+                self.urls['profile'], HTTP_IF_NONE_MATCH=etags['profile']
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_group_and_author_changes_refresh_etag(self):
+        """Переименование группы или автора меняет ETag карточек."""
+        etags = self.etags()
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новый заголовок'
+        group.save()
+        self.assert_status(etags, 200)
+
+        etag = self.etags()['group_list']
+        author = User.objects.get(pk=self.author.pk)
+        author.username = 'ivan_new'
+        author.save()
+        response = self.authorized_client.get(
+            self.urls['group_list'], HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertContains(response, '@ivan_new')
+
+    def test_etag_depends_on_user(self):
+        """Разные пользователи не получают чужой 304."""
+        etags = self.etags()
+        self.assert_status(etags, 200, Client())
+
+    def test_previous_page_etag_tracks_rendered_posts(self):
+        """ETag страницы по курсору назад считается по её же постам."""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=self.author)
+            for number in range(34)
+        )
+        cache.clear()
+        url = self.urls['profile']
+        cursor = None
+        for _ in range(2):
+            cursor = self.authorized_client.get(
+                url, {'cursor': cursor or ''}
+            ).context['page_obj'].next_cursor
+        third = self.authorized_client.get(url, {'cursor': cursor})
+        previous = third.context['page_obj'].previous_cursor
+        response = self.authorized_client.get(url, {'cursor': previous})
+        shown = response.context['page_obj'][0]
+
+        shown.text = 'Исправленный пост'
+        shown.save()
+        response = self.authorized_client.get(
+            url, {'cursor': previous}, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertContains(response, 'Исправленный пост')
+
+    def test_post_detail_etag_depends_on_csrf_cookie(self):
+        """Новый CSRF-токен (вход, выход) — страница с формой заново."""
+        etag = self.etags()['post_detail']
+        self.authorized_client.cookies['csrftoken'] = 'x' * 64
+        response = self.authorized_client.get(
+            self.urls['post_detail'], HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,125 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, User, UserStats
+
+
+class CountersTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_stats_follow_changes(self):
+        """Счётчики меняются вместе с постами, подписками и комментариями."""
+        self.guest_client.get(reverse('posts:profile',
+                                      kwargs={'username': 'ivan'}))
+        self.guest_client.get(reverse('posts:profile',
+                                      kwargs={'username': 'oleg'}))
+
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(post=post, author=self.user, text='Текст')
+        follow = Follow.objects.create(user=self.user, author=self.author)
+
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.user).following_count, 1)
+
+        follow.delete()
+        post.comments.all().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.user).following_count, 0)
+
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_profile_makes_no_count_queries(self):
+        """Профиль не выполняет COUNT-запросов для счётчиков."""
+        Post.objects.create(text='Пост', author=self.author)
+        Follow.objects.create(user=self.user, author=self.author)
+        url = reverse('posts:profile', kwargs={'username': 'ivan'})
+        self.guest_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(url)
+        self.assertFalse(
+            [query for query in queries if 'COUNT(' in query['sql']]
+        )
+        self.assertEqual(response.context['posts_count'], 1)
+        self.assertEqual(response.context['followers_count'], 1)
+        self.assertEqual(response.context['follow_count'], 0)
+
+    def test_rebuild_counters_command(self):
+        """Команда rebuild_counters пересчитывает счётчики."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(post=post, author=self.user, text='Текст')
+        Follow.objects.create(user=self.user, author=self.author)
+        Post.objects.update(comments_count=5)
+        UserStats.objects.all().delete()
+
+        call_command('rebuild_counters', stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.user).following_count, 1)
+
+    def test_edit_keeps_concurrent_comment_count(self):
+        """Правка поста не затирает счётчик комментариев, выросший за
+        время запроса.
+        """
+        post = Post.objects.create(text='Пост', author=self.author)
+        stale = Post.objects.get(pk=post.pk)
+        Comment.objects.create(post=post, author=self.user, text='Текст')
+        client = Client()
+        client.force_login(self.author)
+
+        with mock.patch('posts.views.get_object_or_404', return_value=stale):
+            client.post(
+                reverse('posts:post_edit', kwargs={
+                    'username': 'ivan', 'post_id': post.pk
+                }),
+                {'text': 'Исправленный пост'}
+            )
+
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Исправленный пост')
+        self.assertEqual(post.comments_count, 1)
+
+    def test_counters_do_not_go_below_zero(self):
+        """Удаление после загрузки без сигналов не уводит счётчик в минус."""
+        self.guest_client.get(reverse('posts:profile',
+                                      kwargs={'username': 'ivan'}))
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.bulk_create(
+            [Comment(post=post, author=self.user, text='Текст')]
+        )
+        Follow.objects.bulk_create(
+            [Follow(user=self.user, author=self.author)]
+        )
+
+        Comment.objects.all().delete()
+        Follow.objects.all().delete()
+
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
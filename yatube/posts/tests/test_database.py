@@ -0,0 +1,168 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.db.backends.sqlite3.base import DatabaseWrapper
+from core.db.pool import discard, get_pool
+from core.db.routers import PIN_COOKIE, ReplicaRouter, replica_reads
+from posts.models import Post, User
+
+with_replica = mock.patch(
+    'core.db.routers.replica_enabled', return_value=True
+)
+
+
+class PoolTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.settings_dict = {
+            **settings.DATABASES['default'],
+            'NAME': os.path.join(directory, 'pool.sqlite3'),
+            'POOL_SIZE': 1,
+            'TIME_ZONE': None,
+            'OPTIONS': {},
+            'AUTOCOMMIT': True,
+            'ATOMIC_REQUESTS': False,
+            'CONN_MAX_AGE': 0,
+        }
+        self.addCleanup(self.drain)
+
+    def wrapper(self):
+        return DatabaseWrapper(self.settings_dict, alias='pool_test')
+
+    def drain(self):
+        """Пул общий на alias: соединения не должны уходить в другой тест."""
+        pool = get_pool('pool_test', 1)
+        while not pool.empty():
+            discard(pool.get_nowait())
+
+    def test_closed_connection_is_reused(self):
+        """Закрытое соединение возвращается в пул и берётся повторно."""
+        first = self.wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+
+        second = self.wrapper()
+        second.ensure_connection()
+        self.assertIs(second.connection, raw)
+
+        third = self.wrapper()
+        third.ensure_connection()
+        self.assertIsNot(third.connection, raw)
+        second.close()
+        third.close()
+
+    def test_only_new_connections_are_counted(self):
+        """Взятое из пула соединение не считается новым в метриках."""
+        with mock.patch('core.apps.prometheus.inc') as inc:
+            first = self.wrapper()
+            first.ensure_connection()
+            first.close()
+            second = self.wrapper()
+            second.ensure_connection()
+            second.close()
+        self.assertEqual(inc.call_count, 1)
+
+    def test_pragmas_applied_to_new_connections(self):
+        """Новое соединение с SQLite получает PRAGMA из настроек."""
+        wrapper = self.wrapper()
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        self.assertEqual(raw.execute('PRAGMA journal_mode').fetchone()[0],
+                         'wal')
+        self.assertEqual(raw.execute('PRAGMA synchronous').fetchone()[0], 1)
+        self.assertEqual(raw.execute('PRAGMA busy_timeout').fetchone()[0],
+                         settings.SQLITE_PRAGMAS['busy_timeout'])
+        wrapper.close()
+
+    def test_bench_sqlite(self):
+        """Замер нагрузки печатает оба профиля и не трогает базу."""
+        posts = Post.objects.count()
+        out = StringIO()
+        call_command('bench_sqlite', readers=2, writers=1, seconds=0.2,
+                     stdout=out)
+        self.assertIn('default  запись', out.getvalue())
+        self.assertIn('tuned    чтение', out.getvalue())
+        self.assertEqual(Post.objects.count(), posts)
+
+
+class ReplicaRouterTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def routed(self, request):
+        @replica_reads
+        def view(request):
+            return self.router.db_for_read(Post)
+        return view(request)
+
+    @with_replica
+    def test_reads_go_to_replica_in_read_only_views(self, enabled):
+        """GET в представлениях с replica_reads читает с реплики."""
+        self.assertEqual(self.routed(self.factory.get('/')), 'replica')
+        self.assertEqual(self.routed(self.factory.post('/')), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    @with_replica
+    def test_pinned_user_reads_primary(self, enabled):
+        """После записи пользователь читает с основной базы."""
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(self.routed(request), 'default')
+
+    def test_pinned_user_skips_feed_cache(self):
+        """Закреплённый за default пользователь не получает страницу,
+        собранную по отстающей реплике.
+        """
+        cache.clear()
+        post = Post.objects.create(text='Старый текст', author=self.author)
+        Client().get(reverse('posts:index'))
+        # Как будто страницу в кеш положил запрос к реплике, ещё не
+        # получившей правку.
+        Post.objects.filter(pk=post.pk).update(
+            text='Новый текст', updated_at=timezone.now()
+        )
+
+        client = Client()
+        client.cookies[PIN_COOKIE] = '1'
+        with with_replica:
+            response = client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новый текст')
+        self.assertContains(Client().get(reverse('posts:index')),
+                            'Старый текст')
+
+    def test_without_replica_reads_primary(self):
+        """Без настроенной реплики всё читается с default."""
+        self.assertEqual(self.routed(self.factory.get('/')), 'default')
+
+    def test_read_only_views_work(self):
+        """Представления с replica_reads отвечают как раньше."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        client = Client()
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': 'ivan'}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).status_code, 200)
@@ -0,0 +1,71 @@
+import glob
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ExportYatubeTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def export(self, *args):
+        call_command('export_yatube', self.directory, *args, stdout=StringIO())
+
+    def read(self, name):
+        path = sorted(glob.glob(
+            os.path.join(self.directory, f'{name}-*.jsonl.gz')
+        ))[-1]
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_full_export(self):
+        """Выгружаются все модели в формате, понятном import_posts."""
+        post = Post.objects.create(
+            text='Пост', author=self.author, group=self.group
+        )
+        Comment.objects.create(post=post, author=self.user, text='Текст')
+        Follow.objects.create(user=self.user, author=self.author)
+
+        self.export()
+
+        [row] = self.read('posts')
+        self.assertEqual(row['id'], post.pk)
+        self.assertEqual(row['author'], 'ivan')
+        self.assertEqual(row['group'], 'group')
+        self.assertEqual(self.read('comments')[0]['post'], post.pk)
+        self.assertEqual(self.read('follows')[0]['user'], 'oleg')
+        self.assertEqual(self.read('groups')[0]['slug'], 'group')
+
+    def test_incremental_export(self):
+        """Повторная выгрузка берёт только новые и изменённые записи."""
+        old = Post.objects.create(text='Старый', author=self.author)
+        Post.objects.create(text='Без изменений', author=self.author)
+        self.export('--incremental')
+
+        old.text = 'Исправленный'
+        old.save()
+        new = Post.objects.create(text='Новый', author=self.author)
+        self.export('--incremental')
+
+        ids = {row['id'] for row in self.read('posts')}
+        self.assertEqual(ids, {old.pk, new.pk})
+        self.assertEqual(self.read('groups'), [])
@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase
+
+from posts.models import Comment, Group, Post, User, UserStats
+from posts.search import get_backend
+
+
+class ImportPostsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def write(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def call(self, *args):
+        out = StringIO()
+        call_command('import_posts', *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_jsonl_posts_in_batches(self):
+        """Посты из JSONL создаются пачками с датами и группами из файла."""
+        rows = [
+            {'id': 100 + i, 'author': 'ivan', 'group': 'group',
+             'text': f'Море {i}', 'pub_date': '2020-01-0%dT10:00:00' % i}
+            for i in range(1, 6)
+        ] + [
+            {'author': 'ivan', 'group': 'нет', 'text': 'Пропуск',
+             'pub_date': '2020-01-01T10:00:00'},
+            {'author': 'ghost', 'text': 'Пропуск',
+             'pub_date': '2020-01-01T10:00:00'},
+        ]
+        path = self.write(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows)
+        )
+
+        output = self.call(path, '--batch-size', '2')
+
+        self.assertIn('Загружено: 5, пропущено: 2', output)
+        post = Post.objects.get(pk=101)
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(post.pub_date.day, 1)
+        self.assertEqual(self.author.stats.posts_count, 5)
+        self.assertEqual(len(get_backend().search('море', 0, 10)), 5)
+
+    def test_import_csv_comments_and_authors(self):
+        """Комментарии из CSV, недостающие авторы создаются по флагу."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        path = self.write('.csv', (
+            'post,author,text,created\n'
+            f'{post.pk},oleg,Первый,2020-01-01T10:00:00+03:00\n'
+            f'{post.pk},ivan,Второй,2020-01-02T10:00:00+03:00\n'
+        ))
+
+        self.call(path, '--model', 'comment', '--create-authors')
+
+        self.assertEqual(Comment.objects.filter(post=post).count(), 2)
+        oleg = User.objects.get(username='oleg')
+        self.assertFalse(oleg.has_usable_password())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
+
+    def test_bad_rows_are_skipped(self):
+        """Битые строки пропускаются, а не обрывают загрузку."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        good = {'author': 'ivan', 'text': 'Хороший',
+                'created': '2020-01-01T10:00:00'}
+        path = self.write('.jsonl', '\n'.join([
+            json.dumps({**good, 'post': post.pk}),
+            json.dumps({**good, 'post': 'abc'}),
+            json.dumps({**good, 'post': post.pk + 100}),
+            json.dumps({**good, 'post': post.pk, 'id': 'x'}),
+            json.dumps({**good, 'post': post.pk,
+                        'created': '2020-13-01T10:00:00'}),
+            '{битый json',
+        ]))
+
+        output = self.call(path, '--model', 'comment')
+
+        self.assertIn('Загружено: 1, пропущено: 5', output)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_existing_ids_are_skipped(self):
+        Post.objects.create(pk=500, text='Старый', author=self.author)
+        row = {'id': 500, 'author': 'ivan', 'text': 'Новый',
+               'pub_date': '2020-01-01T10:00:00'}
+        path = self.write('.jsonl', json.dumps(row))
+
+        output = self.call(path)
+
+        self.assertIn('Загружено: 0, пропущено: 1', output)
+        self.assertEqual(Post.objects.get(pk=500).text, 'Старый')
+
+    def test_explicit_ids_reset_sequence(self):
+        """После загрузки с id из файла последовательность сдвигается."""
+        rows = [
+            {'id': 700, 'author': 'ivan', 'text': 'С id',
+             'pub_date': '2020-01-01T10:00:00'},
+            {'author': 'ivan', 'text': 'Без id',
+             'pub_date': '2020-01-01T10:00:00'},
+        ]
+        with mock.patch.object(connection.ops, 'sequence_reset_sql',
+                               return_value=[]) as reset:
+            self.call(self.write('.jsonl', json.dumps(rows[1])))
+            reset.assert_not_called()
+            self.call(self.write(
+                '.jsonl', '\n'.join(json.dumps(row) for row in rows)
+            ))
+        reset.assert_called_once_with(mock.ANY, [Post])
+        self.assertGreater(
+            Post.objects.create(text='Новый', author=self.author).pk, 700
+        )
+
+    def test_aborted_import_rebuilds_counters(self):
+        """Если загрузка оборвалась, уже загруженное учтено в счётчиках."""
+        rows = [
+            {'author': 'ivan', 'text': f'Пост {number}',
+             'pub_date': '2020-01-01T10:00:00'}
+            for number in range(3)
+        ]
+        path = self.write(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows)
+        )
+        original = Post.objects.bulk_create
+        calls = []
+
+        def fail_second_batch(objects, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise DatabaseError('диск заполнен')
+            return original(objects, *args, **kwargs)
+
+        with mock.patch.object(Post.objects, 'bulk_create',
+                               fail_second_batch):
+            with self.assertRaises(DatabaseError):
+                self.call(path, '--batch-size', '1')
+
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).posts_count, 1
+        )
+        self.assertEqual(len(get_backend().search('пост', 0, 10)), 1)
@@ -0,0 +1,54 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import REGISTRY
+from posts.models import Post, User
+
+
+class InstrumentationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.admin = User.objects.create_user(username='admin', is_staff=True)
+        Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        REGISTRY.reset()
+        self.addCleanup(REGISTRY.reset)
+
+    def test_disabled_by_default(self):
+        """Без сэмплирования заголовка Server-Timing нет."""
+        response = Client().get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(REGISTRY.snapshot(), {})
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_sampled_request_is_measured(self):
+        """Замер попадает в заголовок и в гистограммы по имени view."""
+        url = reverse('posts:profile', kwargs={'username': 'ivan'})
+        response = Client().get(url)
+
+        self.assertRegex(
+            response['Server-Timing'],
+            r'db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, '
+            r'total;dur=[\d.]+'
+        )
+        histograms = REGISTRY.snapshot()['posts:profile']
+        self.assertEqual(histograms['latency_ms']['count'], 1)
+        self.assertGreater(histograms['queries']['sum'], 0)
+        self.assertGreater(histograms['template_ms']['sum'], 0)
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_histograms_for_staff_only(self):
+        """Гистограммы доступны только персоналу."""
+        client = Client()
+        client.get(reverse('posts:index'))
+        url = reverse('instrumentation')
+
+        self.assertEqual(client.get(url).status_code, 302)
+        client.force_login(self.admin)
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('posts:index', response.json())
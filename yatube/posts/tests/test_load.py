@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+
+from posts.management.bench import percentile
+from posts.models import Comment, Follow, Group, Post, User, UserStats
+
+
+class SeedLoadTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'seed_load', users=30, groups=3, posts=200, comments=300,
+            follows=5, batch=50, seed=1, stdout=StringIO()
+        )
+
+    def test_seed_creates_objects(self):
+        """seed_load создаёт заданное число объектов и счётчики."""
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(Follow.objects.filter(user=F('author')).exists())
+        self.assertEqual(
+            sum(UserStats.objects.values_list('posts_count', flat=True)), 200
+        )
+
+    def test_follow_graph_is_skewed(self):
+        """Подписчики распределены неравномерно."""
+        followers = list(UserStats.objects.order_by(
+            '-followers_count'
+        ).values_list('followers_count', flat=True))
+        self.assertGreater(followers[0], 3 * followers[len(followers) // 2])
+
+    def test_bench_load_reports_every_route(self):
+        """bench_load обходит адреса постов и ничего не меняет в базе."""
+        follows = Follow.objects.count()
+        out = StringIO()
+        call_command('bench_load', repeat=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('/follow/', output)
+        self.assertIn('/api/posts/', output)
+        self.assertNotIn(' 500 ', output)
+        self.assertEqual(Follow.objects.count(), follows)
+
+
+class SeedLoadEdgeTests(TestCase):
+
+    def seed(self, **options):
+        call_command(
+            'seed_load', **{'users': 0, 'groups': 0, 'posts': 0,
+                            'comments': 0, 'seed': 1, **options},
+            stdout=StringIO()
+        )
+
+    def test_zero_counts(self):
+        """Нулевые количества ничего не создают и не ломают команду."""
+        self.seed()
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Group.objects.exists())
+        self.assertFalse(Post.objects.exists())
+
+    def test_posts_without_groups(self):
+        """Без групп посты создаются без группы."""
+        self.seed(users=5, posts=20, comments=10)
+        self.assertEqual(Post.objects.filter(group=None).count(), 20)
+        self.assertEqual(Comment.objects.count(), 10)
+
+    def test_posts_need_users(self):
+        """Посты без пользователей и комментарии без постов — ошибка."""
+        with self.assertRaisesMessage(CommandError, 'пользователь'):
+            self.seed(posts=10)
+        with self.assertRaisesMessage(CommandError, 'пост'):
+            self.seed(users=5, comments=10)
+
+
+class PercentileTests(SimpleTestCase):
+
+    def test_nearest_rank(self):
+        """Перцентиль — значение из выборки по ближайшему рангу."""
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(percentile(values, 0.5), 3)
+        self.assertEqual(percentile(values, 0.95), 5)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile([7], 0.95), 7)
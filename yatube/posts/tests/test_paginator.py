@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post, Group, User
+from posts.paginator import CursorPaginator, decode_cursor
+
+POSTS_COUNT = 23
+
+
+class CursorPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test_slug',
+            description='Тестовое описание группы',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.author, group=cls.group)
+            for i in range(POSTS_COUNT)
+        )
+        # Одинаковая дата у всех постов: порядок держится на id.
+        Post.objects.update(pub_date=timezone.now())
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def walk(self, paginator):
+        pages = [paginator.get_page(None)]
+        while pages[-1].next_cursor:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return pages
+
+    def test_pages_cover_all_posts_once(self):
+        """Курсорные страницы обходят все посты без повторов."""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        pages = self.walk(paginator)
+        ids = [post.id for page in pages for post in page]
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 3])
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+        self.assertEqual(
+            ids,
+            list(Post.objects.order_by('-pub_date', '-id')
+                 .values_list('id', flat=True))
+        )
+
+    def test_previous_cursor_returns_same_page(self):
+        """Переход назад возвращает ту же страницу."""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        first, second, third = self.walk(paginator)
+
+        self.assertIsNone(first.previous_cursor)
+        self.assertIsNone(second.previous_cursor)
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertEqual(back.number, 2)
+
+    def test_deep_page_is_one_query(self):
+        """Страница стоит одного запроса без COUNT."""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        cursor = self.walk(paginator)[-1].previous_cursor
+        with self.assertNumQueries(1):
+            paginator.get_page(cursor)
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор открывает первую страницу."""
+        self.assertIsNone(decode_cursor('мусор'))
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            {'cursor': 'bad'}
+        )
+        self.assertEqual(response.context['page_obj'].number, 1)
+        self.assertEqual(
+            len(response.context['page_obj']), settings.POSTS_PER_PAGE
+        )
+
+    def test_feeds_follow_next_cursor(self):
+        """Ленты переходят на следующую страницу по курсору."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                page = self.guest_client.get(url).context['page_obj']
+                response = self.guest_client.get(
+                    url, {'cursor': page.next_cursor}
+                )
+                self.assertEqual(response.context['page_obj'].number, 2)
+                self.assertContains(response, 'Предыдущая')
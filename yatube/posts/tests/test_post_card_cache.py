@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts import feed_cache
+from posts.models import Group, Post, User
+
+
+class PostCardCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test_slug',
+            description='Тестовое описание группы',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Исходный текст', author=self.author, group=self.group
+        )
+        self.url = reverse('posts:group_list',
+                           kwargs={'slug': self.group.slug})
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.user_client = Client()
+        self.user_client.force_login(self.user)
+
+    def test_card_is_served_from_cache(self):
+        """Неизменённый пост берётся из кеша фрагментов."""
+        self.user_client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).update(text='Текст в обход')
+        # Страница ленты строится заново, карточка — из кеша фрагментов.
+        feed_cache.invalidate()
+
+        self.assertContains(self.user_client.get(self.url), 'Исходный текст')
+
+    def test_group_change_updates_card(self):
+        """Переименование группы и перенос поста меняют карточку."""
+        self.user_client.get(self.url)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(self.user_client.get(self.url), '#Новое название')
+
+        other = Group.objects.create(title='Другая группа', slug='other')
+        Post.objects.filter(pk=self.post.pk).update(group=other)
+        feed_cache.invalidate()
+        response = self.user_client.get(reverse('posts:index'))
+        self.assertContains(response, '#Другая группа')
+        self.assertNotContains(response, '#Новое название')
+
+    def test_author_rename_updates_card(self):
+        """Новое имя автора попадает в закешированную карточку."""
+        self.user_client.get(self.url)
+        self.author.username = 'ivan_new'
+        self.author.save()
+        self.addCleanup(setattr, self.author, 'username', 'ivan')
+
+        response = self.user_client.get(self.url)
+        self.assertContains(response, '@ivan_new')
+
+    def test_post_edit_invalidates_card(self):
+        """Правка поста меняет версию ключа и карточку."""
+        self.user_client.get(self.url)
+        self.author_client.post(
+            reverse('posts:post_edit',
+                    kwargs={'username': self.author.username,
+                            'post_id': self.post.pk}),
+            {'text': 'Новый текст', 'group': self.group.pk}
+        )
+
+        response = self.user_client.get(self.url)
+        self.assertContains(response, 'Новый текст')
+        self.assertNotContains(response, 'Исходный текст')
+
+    def test_edit_button_is_not_cached(self):
+        """Кнопка редактирования видна только автору."""
+        self.assertNotContains(self.user_client.get(self.url),
+                               'Редактировать')
+        self.assertContains(self.author_client.get(self.url),
+                            'Редактировать')
+        self.assertNotContains(self.user_client.get(self.url),
+                               'Редактировать')
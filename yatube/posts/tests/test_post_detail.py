@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Post, User
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class PostDetailTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        now = timezone.now()
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {i}')
+            for i in range(7)
+        )
+        # Одинаковое время у части комментариев: порядок держится на id.
+        for number, comment in enumerate(cls.post.comments.order_by('pk')):
+            Comment.objects.filter(pk=comment.pk).update(
+                created=now - timedelta(minutes=number // 2)
+            )
+        cls.url = reverse('posts:post_detail',
+                          kwargs={'post_id': cls.post.pk})
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        # Первый просмотр создаёт строку счётчиков автора.
+        self.guest_client.get(self.url)
+        cache.clear()
+
+    def test_query_count_is_pinned(self):
+        """Пост со счётчиками — один запрос, страница комментариев — ещё
+        один; авторизованному добавляются сессия и пользователь."""
+        with self.assertNumQueries(2):
+            self.guest_client.get(self.url)
+        cache.clear()
+        with self.assertNumQueries(4):
+            self.authorized_client.get(self.url)
+
+    def test_post_rendered_once(self):
+        """Карточка поста выводится один раз и целиком."""
+        Post.objects.filter(pk=self.post.pk).update(text='Текст ' * 200)
+        response = self.guest_client.get(self.url)
+        content = response.content.decode()
+        self.assertEqual(content.count(f'name="post_{self.post.pk}"'), 1)
+        self.assertNotIn('Читать далее', content)
+        self.assertIn('Текст ' * 199, content)
+
+    def all_comments(self):
+        return list(self.post.comments.order_by(
+            '-created', '-pk'
+        ).values_list('text', flat=True))
+
+    def test_comment_pages_follow_keyset(self):
+        """Страницы комментариев идут без пропусков и повторов."""
+        texts = []
+        cursor = None
+        while True:
+            params = {'comments': cursor} if cursor else {}
+            page = self.guest_client.get(
+                self.url, params
+            ).context['comments']
+            texts.extend(comment.text for comment in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(texts, self.all_comments())
+
+    def test_comments_fragment_and_json(self):
+        """Следующие страницы отдаются фрагментом и в JSON."""
+        first = self.guest_client.get(self.url).context['comments']
+        url = reverse('posts:comments', kwargs={'post_id': self.post.pk})
+
+        fragment = self.guest_client.get(url, {'cursor': first.next_cursor})
+        self.assertTemplateUsed(fragment, 'includes/comment_list.html')
+        self.assertNotContains(fragment, '<html')
+        self.assertContains(fragment, 'data-comments-url')
+
+        data = self.guest_client.get(
+            url, {'cursor': first.next_cursor, 'format': 'json'}
+        ).json()
+        self.assertEqual(
+            [row['text'] for row in data['results']],
+            self.all_comments()[3:6]
+        )
+        self.assertEqual(data['results'][0]['author'], 'oleg')
+        self.assertIsNotNone(data['next'])
+
+    def test_comments_of_missing_post(self):
+        """Комментарии несуществующего поста — 404."""
+        url = reverse('posts:comments', kwargs={'post_id': 10 ** 6})
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import prometheus
+from posts.models import Post, User
+
+
+class MmapValuesTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def open(self, name):
+        values = prometheus.MmapValues(os.path.join(self.directory, name))
+        self.addCleanup(values.file.close)
+        return values
+
+    def test_values_of_workers_are_summed(self):
+        """Значения из файлов разных процессов складываются."""
+        first = self.open('metrics-1.db')
+        second = self.open('metrics-2.db')
+        first.inc('hits{view="posts:index"}', 2)
+        second.inc('hits{view="posts:index"}', 3)
+        second.inc('misses', 1)
+
+        with override_settings(METRICS_DIR=self.directory):
+            totals = prometheus.collect()
+        self.assertEqual(totals, {
+            'hits{view="posts:index"}': 5, 'misses': 1,
+        })
+
+    def test_file_grows_and_reopens(self):
+        """Файл растёт при нехватке места, значения читаются заново."""
+        values = self.open('metrics-1.db')
+        for number in range(5000):
+            values.inc(f'key_{number}', number)
+        values.file.close()
+
+        reopened = self.open('metrics-1.db')
+        reopened.inc('key_4999', 1)
+        entries = {
+            key: value for key, _, value in prometheus.read_entries(
+                reopened.mmap
+            )
+        }
+        self.assertEqual(len(entries), 5000)
+        self.assertEqual(entries['key_4999'], 5000)
+
+
+class MetricsEndpointTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_report_requests_and_cache(self):
+        """/metrics отдаёт счётчики запросов по URL и попадания в кеш."""
+        client = Client()
+        client.get(reverse('posts:index'))
+        client.get(reverse('posts:index'))
+
+        response = client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('# TYPE yatube_requests_total counter', text)
+        self.assertRegex(
+            text, r'yatube_requests_total\{status="200",view="posts:index"\}'
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket{le="+Inf",'
+            'view="posts:index"}', text
+        )
+        self.assertIn(
+            'yatube_feed_cache_requests_total{feed="index",result="hit"}',
+            text
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_closed_without_token(self):
+        """Без верного токена /metrics недоступны даже с 127.0.0.1."""
+        client = Client(REMOTE_ADDR='127.0.0.1')
+        for headers in ({}, {'HTTP_AUTHORIZATION': 'Bearer wrong'}):
+            with self.subTest(headers=headers):
+                response = client.get(reverse('metrics'), **headers)
+                self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_does_not_open_metrics(self):
+        """Пустой токен в настройках не пускает с пустым Bearer."""
+        response = Client().get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer '
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_metrics_open_for_staff(self):
+        """Персоналу /metrics доступны без токена."""
+        staff = User.objects.create_user(username='admin', is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        response = client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
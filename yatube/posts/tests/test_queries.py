@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class FeedQueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test_slug',
+            description='Тестовое описание группы',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                text=f'Пост {i}', author=self.author, group=self.group
+            )
+            Comment.objects.create(
+                post=post, author=self.user, text='Комментарий'
+            )
+
+    def count_queries(self, url):
+        # Первый запрос создаёт строку счётчиков автора.
+        self.authorized_client.get(url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_feed_queries_do_not_depend_on_page_size(self):
+        """Число запросов ленты не растёт с числом постов на странице."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+            reverse('posts:follow_index'),
+        )
+        self.create_posts(1)
+        budgets = {url: self.count_queries(url) for url in urls}
+        self.create_posts(9)
+
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), budgets[url])
+
+    def test_feed_shows_comment_count(self):
+        """Карточка поста показывает число комментариев из счётчика."""
+        self.create_posts(1)
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'][0].comments_count, 1)
+        self.assertContains(response, 'Комментариев: 1')
+
+    def test_cached_index_page_needs_no_queries(self):
+        """Закешированная главная страница не обращается к базе."""
+        self.create_posts(3)
+        guest_client = Client()
+        guest_client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            guest_client.get(reverse('posts:index'))
@@ -0,0 +1,108 @@
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+def full_scans(sql, allow_sort=False):
+    """Таблицы, которые SQLite читает целиком без индекса, и сортировки
+    без индекса.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = [row[-1] for row in cursor.fetchall()]
+    return [
+        detail for detail in plan
+        if detail.startswith('SCAN') and 'USING' not in detail
+        # Сортировка во временном B-дереве: индекс не подходит к ORDER BY.
+        or not allow_sort
+        and detail.startswith('USE TEMP B-TREE FOR ORDER BY')
+    ]
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN из SQLite')
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок группы',
+            slug='test_slug',
+            description='Тестовое описание группы',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.author, group=cls.group)
+            for i in range(15)
+        )
+        cls.post = Post.objects.first()
+        Comment.objects.create(post=cls.post, author=cls.user, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assert_no_full_scans(self, url, params=None, allow_sort=False):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        for query in queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            with self.subTest(url=url, sql=sql):
+                self.assertEqual(full_scans(sql, allow_sort), [])
+        return response
+
+    def check_feed(self, url, allow_sort=False):
+        first = self.assert_no_full_scans(
+            url, allow_sort=allow_sort
+        ).context['page_obj']
+        self.assertIsNotNone(first.next_cursor)
+        page = self.assert_no_full_scans(
+            url, {'cursor': first.next_cursor}, allow_sort
+        ).context['page_obj']
+        self.assertEqual(page.number, 2)
+        self.assertTrue(page.object_list)
+        self.assertNotIn(page.object_list[0], first.object_list)
+
+    def test_feeds_use_indexes(self):
+        """Ленты читаются по индексам в порядке ключа на всех страницах."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+        )
+        for url in urls:
+            self.check_feed(url)
+
+    def test_follow_feed_uses_indexes(self):
+        """Лента подписок читается по индексам.
+
+        Она сливает посты нескольких авторов, поэтому без сортировки не
+        обойтись; сортируются только посты подписок, найденные по индексу.
+        """
+        self.check_feed(reverse('posts:follow_index'), allow_sort=True)
+
+    @override_settings(TIMELINE_FANOUT=True)
+    def test_timeline_uses_indexes(self):
+        """Лента подписок из входящих читается по индексам."""
+        self.check_feed(reverse('posts:follow_index'), allow_sort=True)
+
+    def test_post_detail_uses_indexes(self):
+        """Страница поста и её комментарии читаются по индексам."""
+        self.assert_no_full_scans(reverse(
+            'posts:post_detail',
+            kwargs={'username': self.author.username,
+                    'post_id': self.post.id}
+        ))
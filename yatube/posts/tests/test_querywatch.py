@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.querywatch import normalize, watch
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class QueryWatchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for number in range(10):
+            post = Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+            Comment.objects.create(post=post, author=cls.user, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_normalize(self):
+        """Форма запроса не зависит от значений и длины IN."""
+        self.assertEqual(
+            normalize('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21'),
+            normalize('SELECT * FROM t WHERE id IN (%s) LIMIT 5'),
+        )
+
+    def test_detects_n_plus_one_in_template(self):
+        """Обращение к связанному объекту в цикле шаблона — это N+1."""
+        template = Template(
+            '{% for post in posts %}{{ post.author.username }}{% endfor %}'
+        )
+        with watch(threshold=5) as watcher:
+            template.render(Context({'posts': Post.objects.all()}))
+
+        [(shape, count)] = watcher.n_plus_one()
+        self.assertEqual(count, 10)
+        self.assertIn('auth_user', shape)
+        self.assertIn('шаблон', watcher.report())
+
+    def test_pages_have_no_n_plus_one(self):
+        """На страницах лент и поста нет повторяющихся запросов."""
+        client = Client()
+        client.force_login(self.user)
+        post = Post.objects.first()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'ivan'}),
+            reverse('posts:follow_index'),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with watch(threshold=1) as watcher:
+                    client.get(url)
+                self.assertEqual(watcher.n_plus_one(), [], watcher.report())
+
+    @override_settings(QUERY_WATCH=True)
+    def test_middleware_logs_slow_queries(self):
+        """Медленные запросы пишутся в журнал со стеком."""
+        with override_settings(SLOW_QUERY_MS=0):
+            with self.assertLogs('core.queries', 'WARNING') as logs:
+                Client().get(reverse('posts:index'))
+        self.assertIn('Медленный запрос', logs.output[0])
+        self.assertIn('views.py', logs.output[0])
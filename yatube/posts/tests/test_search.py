@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.contrib.admin.sites import site
+from django.core.management import call_command
+from django.test import TestCase, Client, RequestFactory
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.search import get_backend
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.sea = Post.objects.create(
+            text='Поехали на море, море тёплое', author=cls.author
+        )
+        cls.mountains = Post.objects.create(
+            text='Горы и море', author=cls.author
+        )
+        cls.city = Post.objects.create(
+            text='Городской пейзаж', author=cls.author
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+        return [post.pk for post in response.context['posts']]
+
+    def test_search_ranks_results(self):
+        """Чаще упомянутое слово поднимает пост выше."""
+        self.assertEqual(self.search('море'),
+                         [self.sea.pk, self.mountains.pk])
+
+    def test_prefix_search(self):
+        """Слово со звёздочкой ищется как префикс."""
+        self.assertEqual(sorted(self.search('гор*')),
+                         [self.mountains.pk, self.city.pk])
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        city = Post.objects.get(pk=self.city.pk)
+        city.text = 'Морской город'
+        city.save()
+        self.assertEqual(self.search('морской'), [city.pk])
+
+        city.delete()
+        self.assertEqual(self.search('морской'), [])
+
+    def test_search_paginates(self):
+        """Поиск листается по страницам."""
+        Post.objects.bulk_create(
+            Post(text='Поезд', author=self.author) for _ in range(12)
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('поезд')), 10)
+        self.assertEqual(len(self.search('поезд', page=2)), 2)
+
+    def test_admin_uses_search_backend(self):
+        """Поиск в админке идёт через индекс."""
+        admin = site._registry[Post]
+        request = RequestFactory().get('/admin/posts/post/')
+        posts, _ = admin.get_search_results(
+            request, Post.objects.all(), 'тёплое'
+        )
+        self.assertEqual(list(posts), [self.sea])
+        self.assertEqual(
+            list(get_backend().filter(Post.objects.all(), '')), []
+        )
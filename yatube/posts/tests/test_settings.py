@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from yatube.settings.base import cache
+
+PRINT_SETTINGS = (
+    'from django.conf import settings; import json; print(json.dumps(['
+    'settings.DEBUG, settings.TEMPLATE_CACHE, '
+    'settings.CACHES["default"]["BACKEND"], settings.SESSION_ENGINE, '
+    'settings.STATICFILES_STORAGE, settings.THUMBNAIL_WORKERS, '
+    'settings.ALLOWED_HOSTS]))'
+)
+PROD = {
+    'DJANGO_ENV': 'prod', 'SECRET_KEY': 'x', 'ALLOWED_HOSTS': 'example.com',
+}
+
+
+def load_settings(**env):
+    """Значения настроек в отдельном процессе с заданным окружением."""
+    environ = {
+        key: value for key, value in os.environ.items()
+        if key not in ('DEBUG', 'SECRET_KEY', 'CACHE_BACKEND',
+                       'TEMPLATE_CACHE', 'DJANGO_ENV', 'THUMBNAIL_WORKERS',
+                       'ALLOWED_HOSTS')
+    }
+    environ.update(env, DJANGO_SETTINGS_MODULE='yatube.settings')
+    result = subprocess.run(
+        [sys.executable, '-c', PRINT_SETTINGS], cwd=settings.BASE_DIR,
+        env=environ, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise ImproperlyConfigured(result.stderr)
+    return json.loads(result.stdout)
+
+
+class SettingsProfileTests(SimpleTestCase):
+
+    def test_dev_profile(self):
+        """По умолчанию профиль разработки: DEBUG, шаблоны с диска и
+        миниатюры прямо в запросе.
+        """
+        self.assertEqual(load_settings(), [
+            True, False, 'django.core.cache.backends.locmem.LocMemCache',
+            'django.contrib.sessions.backends.db',
+            'django.contrib.staticfiles.storage.StaticFilesStorage', 0,
+            ['localhost', '127.0.0.1', '[::1]', 'testserver'],
+        ])
+
+    def test_prod_profile(self):
+        """Боевой профиль включает кеши, сжатую статику и пул миниатюр."""
+        self.assertEqual(load_settings(**PROD), [
+            False, True, 'core.cache.SQLiteCache',
+            'django.contrib.sessions.backends.cached_db',
+            'core.storage.CompressedManifestStaticFilesStorage', 2,
+            ['example.com'],
+        ])
+
+    def test_prod_profile_env_overrides(self):
+        """Переменные окружения важнее значений профиля."""
+        values = load_settings(
+            **PROD, CACHE_BACKEND='locmem', TEMPLATE_CACHE='0',
+            THUMBNAIL_WORKERS='0'
+        )
+        self.assertEqual(values[1:3], [
+            False, 'django.core.cache.backends.locmem.LocMemCache'
+        ])
+        self.assertEqual(values[5], 0)
+
+    def test_prod_requires_secret_key(self):
+        """Без SECRET_KEY боевой профиль не запускается."""
+        with self.assertRaisesMessage(ImproperlyConfigured, 'SECRET_KEY'):
+            load_settings(DJANGO_ENV='prod', ALLOWED_HOSTS='example.com')
+
+    def test_prod_requires_allowed_hosts(self):
+        """Боевой профиль не берёт хосты разработки с testserver."""
+        with self.assertRaisesMessage(ImproperlyConfigured, 'ALLOWED_HOSTS'):
+            load_settings(DJANGO_ENV='prod', SECRET_KEY='x')
+
+    def test_unknown_cache_backend(self):
+        with self.assertRaises(ImproperlyConfigured):
+            cache('redis')
+
+
+class CompressedStaticTests(SimpleTestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_collectstatic_writes_gzip(self):
+        """collectstatic кладёт рядом с файлами с хешем копии .gz."""
+        with override_settings(
+            STATIC_ROOT=self.root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'
+            ),
+        ):
+            call_command('collectstatic', interactive=False, stdout=StringIO())
+            with open(os.path.join(self.root, 'staticfiles.json')) as file:
+                paths = json.load(file)['paths']
+            missing = staticfiles_storage.url('jquery/dist/jquery.min.js')
+
+        css = os.path.join(self.root, paths['admin/css/base.css'])
+        self.assertTrue(os.path.exists(css + '.gz'))
+        self.assertLess(os.path.getsize(css + '.gz'), os.path.getsize(css))
+        image = os.path.join(self.root, paths['img/author.jpg'])
+        self.assertFalse(os.path.exists(image + '.gz'))
+        self.assertEqual(missing, '/static/jquery/dist/jquery.min.js')
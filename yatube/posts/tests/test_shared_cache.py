@@ -0,0 +1,132 @@
+import multiprocessing
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.cache import SQLiteCache
+
+
+def increment(path, count):
+    cache = SQLiteCache(path, {})
+    for _ in range(count):
+        cache.incr('counter')
+
+
+class SQLiteCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = f'{directory}/cache.sqlite3'
+        self.cache = SQLiteCache(self.path, {})
+
+    def test_get_set_delete(self):
+        self.cache.set('page', {'rows': [1, 2]})
+        self.cache.set('count', 3)
+        self.assertEqual(self.cache.get('page'), {'rows': [1, 2]})
+        self.assertEqual(
+            self.cache.get_many(['page', 'count', 'missing']),
+            {'page': {'rows': [1, 2]}, 'count': 3}
+        )
+        self.cache.delete_many(['page', 'count'])
+        self.assertIsNone(self.cache.get('page'))
+        self.assertEqual(self.cache.get('count', 'нет'), 'нет')
+
+    def test_shared_between_instances(self):
+        """Запись одного воркера видна другому, как и удаление."""
+        other = SQLiteCache(self.path, {})
+        self.cache.set('posts:feed:index:', 'страница')
+        self.assertEqual(other.get('posts:feed:index:'), 'страница')
+        other.delete('posts:feed:index:')
+        self.assertIsNone(self.cache.get('posts:feed:index:'))
+
+    def test_timeout(self):
+        """Просроченная запись не отдаётся, add() её заменяет."""
+        self.cache.set('old', 1, timeout=-1)
+        self.assertIsNone(self.cache.get('old'))
+        self.assertFalse(self.cache.has_key('old'))
+        self.assertTrue(self.cache.add('old', 2))
+        self.assertFalse(self.cache.add('old', 3))
+        self.assertEqual(self.cache.get('old'), 2)
+        self.assertTrue(self.cache.touch('old', None))
+        self.assertFalse(self.cache.touch('missing'))
+
+    def test_incr(self):
+        self.cache.set('count', 1)
+        self.assertEqual(self.cache.incr('count', 5), 6)
+        self.assertEqual(self.cache.decr('count'), 5)
+        self.cache.set('ratio', 1.5)
+        self.assertEqual(self.cache.incr('ratio'), 2.5)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    @skipUnless(hasattr(sqlite3.Connection, 'setlimit'),
+                'Connection.setlimit() — с Python 3.11')
+    def test_many_keys_fit_old_variable_limit(self):
+        """get_many/delete_many с тысячами ключей укладываются в 999
+        параметров старых SQLite.
+        """
+        cache = SQLiteCache(self.path, {'OPTIONS': {'MAX_ENTRIES': 2000}})
+        cache.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        data = {f'key_{number}': number for number in range(1200)}
+        cache.set_many(data)
+
+        self.assertEqual(cache.get_many(list(data)), data)
+        cache.delete_many(list(data))
+        self.assertEqual(cache.get_many(list(data)), {})
+
+    def test_incr_without_returning(self):
+        """incr() обходится без UPDATE ... RETURNING из SQLite 3.35."""
+        self.cache.set('count', 1)
+        statements = []
+        self.cache.connection.set_trace_callback(statements.append)
+        self.addCleanup(self.cache.connection.set_trace_callback, None)
+
+        self.assertEqual(self.cache.incr('count', 2), 3)
+        self.assertTrue(statements)
+        for statement in statements:
+            self.assertNotIn('RETURNING', statement.upper())
+
+    def test_incr_is_atomic_across_processes(self):
+        """Одновременные incr() из разных процессов не теряются."""
+        self.cache.set('counter', 0)
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=increment, args=(self.path, 100))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.cache.get('counter'), 400)
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняются давно не читанные записи."""
+        cache = SQLiteCache(self.path, {'OPTIONS': {
+            'MAX_ENTRIES': 10, 'CULL_FREQUENCY': 5, 'CULL_EVERY': 1,
+            'LRU_RESOLUTION': 0,
+        }})
+        for number in range(10):
+            cache.set(f'key{number}', number)
+        cache.get('key0')
+        cache.set('key10', 10)
+
+        self.assertEqual(cache.get('key0'), 0)
+        self.assertIsNone(cache.get('key1'))
+        self.assertIsNone(cache.get('key2'))
+        self.assertIsNone(cache.get('key3'))
+        self.assertEqual(cache.get('key4'), 4)
+        self.assertEqual(cache.get('key10'), 10)
+
+    def test_bench_cache(self):
+        """bench_cache сравнивает бэкенды и проверяет общий счётчик."""
+        out = StringIO()
+        call_command('bench_cache', operations=40, processes=2, stdout=out)
+        self.assertIn('sqlite   2 процесса × 20 incr: счётчик 40 из 40',
+                      out.getvalue())
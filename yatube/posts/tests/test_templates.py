@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from core.templates import template_names, warm
+from posts.models import Post, User
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [('django.template.loaders.cached.Loader',
+                     settings.TEMPLATE_LOADERS)],
+    },
+}]
+
+
+class TemplateWarmTests(TestCase):
+
+    def test_template_names(self):
+        """В список попадают шаблоны проекта, с --apps — и приложений."""
+        names = template_names()
+        self.assertIn('posts/index.html', names)
+        self.assertNotIn('admin/base.html', names)
+        self.assertIn('admin/base.html', template_names(with_apps=True))
+
+    def test_warm_templates_command(self):
+        """warm_templates компилирует все шаблоны без ошибок."""
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn(
+            f'Скомпилировано шаблонов: {len(template_names())}',
+            out.getvalue()
+        )
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warm_fills_cached_loader(self):
+        """После прогрева шаблон ленты уже лежит в кеше загрузчика."""
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertNotIn('posts/index.html', loader.get_template_cache)
+        _, errors, _ = warm()
+        self.assertEqual(errors, [])
+        self.assertIn('posts/index.html', loader.get_template_cache)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_pages_render_with_cached_loader(self):
+        """Страницы рендерятся с кеширующим загрузчиком так же."""
+        Post.objects.create(
+            text='Пост из кеша шаблонов',
+            author=User.objects.create(username='leo')
+        )
+        for _ in range(2):
+            response = self.client.get('/')
+            self.assertContains(response, 'Пост из кеша шаблонов')
+
+    def test_bench_templates(self):
+        """bench_templates сравнивает рендер с кешем и без."""
+        out = StringIO()
+        call_command('bench_templates', renders=3, stdout=out)
+        output = out.getvalue()
+        self.assertIn('без кеша', output)
+        self.assertIn('cached', output)
+        self.assertIn('экономия', output)
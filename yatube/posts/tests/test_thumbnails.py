@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import thumbnails
+from posts.models import Post, PostImageVariant, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(name='picture.png', size=(1200, 800)):
+    content = BytesIO()
+    Image.new('RGB', size, color=(200, 0, 0)).save(content, 'png')
+    return SimpleUploadedFile(name, content.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ThumbnailTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Пост с картинкой', author=self.author, image=image_file()
+        )
+
+    def test_generate_stores_thumbnail(self):
+        """Миниатюра строится заранее и записывается в пост."""
+        name = thumbnails.generate(self.post.pk)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.thumbnail.name, name)
+        with Image.open(self.post.thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, (960, 339))
+
+    def test_generate_stores_variants(self):
+        """Для каждой ширины строятся JPEG и WebP варианты."""
+        thumbnails.generate(self.post.pk)
+
+        variants = PostImageVariant.objects.filter(post=self.post)
+        self.assertEqual(
+            sorted(variants.values_list('format', 'width')),
+            sorted(
+                (image_format, width)
+                for width in settings.THUMBNAIL_WIDTHS
+                for image_format in thumbnails.FORMATS
+            )
+        )
+        webp = variants.get(format=PostImageVariant.WEBP, width=320)
+        with Image.open(webp.image.path) as image:
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (320, 113))
+
+    def test_feed_uses_precomputed_thumbnail(self):
+        """Лента показывает готовую миниатюру, а до неё — оригинал."""
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, self.post.image.url)
+
+        thumbnails.generate(self.post.pk)
+        self.post.refresh_from_db()
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, self.post.thumbnail.url)
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, ' 320w, ')
+        widths = [
+            int(source.rsplit(' ', 1)[1][:-1])
+            for source in self.post.webp_srcset.split(', ')
+        ]
+        self.assertEqual(widths, sorted(settings.THUMBNAIL_WIDTHS))
+
+    def test_edit_drops_old_variants(self):
+        """Новая картинка в post_edit сразу убирает варианты старой."""
+        thumbnails.generate(self.post.pk)
+        client = Client()
+        client.force_login(self.author)
+        # В TestCase on_commit не срабатывает: новые миниатюры не
+        # строятся, видно только то, что сделала сама правка.
+        client.post(
+            reverse('posts:post_edit',
+                    kwargs={'username': self.author.username,
+                            'post_id': self.post.pk}),
+            {'text': self.post.text, 'image': image_file('new.png')}
+        )
+
+        self.post.refresh_from_db()
+        self.assertFalse(self.post.thumbnail)
+        self.assertFalse(
+            PostImageVariant.objects.filter(post=self.post).exists()
+        )
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, self.post.image.url)
+        self.assertNotContains(response, 'type="image/webp"')
+
+    def test_generate_thumbnails_command(self):
+        """Команда generate_thumbnails строит недостающие миниатюры."""
+        out = StringIO()
+        call_command('generate_thumbnails', workers=0, stdout=out)
+
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.thumbnail)
+        self.assertIn('1', out.getvalue())
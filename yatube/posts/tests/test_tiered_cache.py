@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.tiered import TwoTierCache
+from posts import feed_cache
+from posts.models import Follow, Post, User
+
+
+class TwoTierCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        # Два экземпляра — как L1 двух воркеров перед общим L2.
+        self.worker = TwoTierCache()
+        self.other = TwoTierCache()
+
+    def test_l1_serves_without_l2(self):
+        """Прочитанное из L2 дальше отдаётся из памяти процесса."""
+        self.worker.set('page', 'страница', 60, ('posts',))
+        self.assertEqual(self.other.get('page', ('posts',)), 'страница')
+
+        cache.clear()
+        self.assertEqual(self.other.get('page', ('posts',)), None)
+        self.other.set('page', 'страница', 60)
+        cache.clear()
+        self.assertEqual(self.other.get('page'), 'страница')
+
+    def test_bump_is_seen_by_other_workers_next_request(self):
+        """После bump() L1 других воркеров устаревает со следующего
+        запроса.
+        """
+        self.other.set('page', 'старая', 60, ('posts',))
+        self.other.start_request()
+        self.assertEqual(self.other.get('page', ('posts',)), 'старая')
+
+        self.worker.bump('posts')
+        self.assertEqual(self.other.get('page', ('posts',)), 'старая')
+        self.other.finish_request()
+
+        self.other.start_request()
+        self.assertIsNone(self.other.get('page', ('posts',)))
+        self.other.finish_request()
+
+    def test_bump_only_listed_generations(self):
+        self.worker.set('feed', 'лента', 60, ('posts', 'follows'))
+        self.worker.set('profile', 'профиль', 60, ('posts',))
+        self.worker.bump('follows')
+        self.assertIsNone(self.worker.get('feed', ('posts', 'follows')))
+        self.assertEqual(self.worker.get('profile', ('posts',)), 'профиль')
+
+    def test_lost_generation_does_not_revive_l1(self):
+        """Если L2 потерял номер поколения, старый L1 не оживает."""
+        self.worker.set('page', 'старая', 60, ('posts',))
+        cache.clear()
+        self.assertIsNone(self.worker.get('page', ('posts',)))
+
+    def test_timeout(self):
+        self.worker.set('page', 'страница', -1)
+        self.assertIsNone(self.worker.get('page'))
+
+    @override_settings(TIERED_CACHE_SIZE=2)
+    def test_l1_is_bounded(self):
+        for number in range(3):
+            self.worker.set(f'page{number}', number, 60)
+        self.worker.get('page1')
+        self.worker.set('page3', 3, 60)
+        self.assertEqual(list(self.worker.entries), ['page1', 'page3'])
+
+
+class TieredFeedTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='oleg')
+        cls.author = User.objects.create_user(username='ivan')
+        cls.other = User.objects.create_user(username='petr')
+        Post.objects.create(text='Пост Ивана', author=cls.author)
+        Post.objects.create(text='Пост Петра', author=cls.other)
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_follow_change_invalidates_follow_feed(self):
+        """Новая подписка сразу видна в закешированной ленте подписок."""
+        url = reverse('posts:follow_index')
+        self.assertNotContains(self.client.get(url), 'Пост Петра')
+        Follow.objects.create(user=self.user, author=self.other)
+        self.assertContains(self.client.get(url), 'Пост Петра')
+
+    def test_new_post_invalidates_profile(self):
+        url = reverse('posts:profile', kwargs={'username': 'ivan'})
+        self.client.get(url)
+        Post.objects.create(text='Второй пост Ивана', author=self.author)
+        self.assertContains(self.client.get(url), 'Второй пост Ивана')
+
+    def test_cached_profile_page_skips_post_queries(self):
+        """Повторный профиль берёт страницу постов из кеша."""
+        url = reverse('posts:profile', kwargs={'username': 'ivan'})
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(url)
+        sql = [query['sql'] for query in second]
+        self.assertFalse(any('"posts_post"."text"' in query for query in sql))
+        self.assertFalse(any('posts_postimagevariant' in query
+                             for query in sql))
+        self.assertLess(len(second), len(first))
+
+    def test_invalid_cursor_uses_first_page_key(self):
+        """Битый курсор берёт первую страницу из её же записи кеша."""
+        url = reverse('posts:index')
+        self.client.get(url)
+        for cursor in ('мусор', 'AAAA', 'eyJ4IjogMX0'):
+            with self.subTest(cursor=cursor):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, {'cursor': cursor})
+                self.assertContains(response, 'Пост Ивана')
+                self.assertFalse(any(
+                    '"posts_post"."text"' in query['sql']
+                    for query in queries
+                ))
+        self.assertEqual(
+            feed_cache.page_key('index', '', 'мусор'),
+            feed_cache.page_key('index', '', None),
+        )
@@ -0,0 +1,143 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts import counters, timeline
+from posts.models import Follow, Post, User
+
+
+@override_settings(
+    TIMELINE_FANOUT=True,
+    TIMELINE_LENGTH=5,
+    TIMELINE_MAX_FOLLOWING=2,
+    TIMELINE_CELEBRITY_FOLLOWERS=1,
+)
+class TimelineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='ivan')
+        cls.user = User.objects.create_user(username='oleg')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def feed_texts(self, **params):
+        response = self.authorized_client.get(
+            reverse('posts:follow_index'), params
+        )
+        return [post.text for post in response.context['page_obj']]
+
+    def test_new_post_is_pushed_to_inbox(self):
+        """Новый пост попадает во входящие подписчика."""
+        self.feed_texts()
+        post = Post.objects.create(text='Новый пост', author=self.author)
+
+        inbox = cache.get(timeline.inbox_key(self.user.pk))
+        self.assertEqual(inbox['ids'], [post.pk])
+        self.assertEqual(self.feed_texts(), ['Новый пост'])
+
+    def test_follow_change_drops_inbox(self):
+        """Подписка и отписка сбрасывают входящие."""
+        self.feed_texts()
+        Follow.objects.filter(user=self.user).delete()
+        self.assertIsNone(cache.get(timeline.inbox_key(self.user.pk)))
+
+    def test_truncated_inbox_falls_back_to_join(self):
+        """Обрезанные входящие дочитываются через JOIN."""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author) for i in range(12)
+        )
+        self.assertFalse(timeline.build_inbox(self.user)['complete'])
+
+        first = self.authorized_client.get(
+            reverse('posts:follow_index')
+        ).context['page_obj']
+        self.assertEqual(len(first), 10)
+        self.assertEqual(len(self.feed_texts(cursor=first.next_cursor)), 2)
+
+    def test_celebrity_posts_are_pulled(self):
+        """Посты популярного автора читаются без рассылки."""
+        fan = User.objects.create_user(username='fan')
+        Follow.objects.create(user=fan, author=self.author)
+        self.feed_texts()
+        post = Post.objects.create(text='Пост звезды', author=self.author)
+
+        inbox = cache.get(timeline.inbox_key(self.user.pk))
+        self.assertNotIn(post.pk, inbox['ids'])
+        self.assertEqual(self.feed_texts(), ['Пост звезды'])
+
+    def test_celebrity_survives_cache_clear(self):
+        """Популярность автора не хранится в кеше и не теряется при его
+        очистке.
+        """
+        fan = User.objects.create_user(username='fan')
+        Follow.objects.create(user=fan, author=self.author)
+        self.feed_texts()
+        post = Post.objects.create(text='Пост звезды', author=self.author)
+        inbox = cache.get(timeline.inbox_key(self.user.pk))
+        cache.clear()
+        cache.set(timeline.inbox_key(self.user.pk), inbox)
+
+        self.assertEqual(self.feed_texts(), [post.text])
+        # Без строки счётчиков и с ней ответ один и тот же.
+        for _ in range(2):
+            self.assertEqual(timeline.celebrities([self.author.pk, fan.pk]),
+                             {self.author.pk})
+            counters.get_stats(self.author)
+
+    def test_truncated_inbox_keeps_posts_behind_celebrity(self):
+        """За окном обрезанных входящих не теряются посты обычных
+        авторов, перемешанные с постами популярного.
+        """
+        star = User.objects.create_user(username='star')
+        fan = User.objects.create_user(username='fan')
+        Follow.objects.create(user=self.user, author=star)
+        Follow.objects.create(user=fan, author=star)
+        self.feed_texts()
+        for number in range(30):
+            Post.objects.create(text=f'Звезда {number}', author=star)
+            if number < 20:
+                Post.objects.create(text=f'Иван {number}', author=self.author)
+        self.assertFalse(
+            cache.get(timeline.inbox_key(self.user.pk))['complete']
+        )
+
+        texts, cursor = [], None
+        while True:
+            page = self.authorized_client.get(
+                reverse('posts:follow_index'), {'cursor': cursor or ''}
+            ).context['page_obj']
+            texts.extend(post.text for post in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(len(texts), 50)
+        self.assertEqual(len(set(texts)), 50)
+        self.assertEqual(
+            len([text for text in texts if text.startswith('Иван')]), 20
+        )
+
+    def test_locked_inbox_is_dropped(self):
+        """Ящик, занятый другой рассылкой, удаляется, а не теряет id."""
+        self.feed_texts()
+        cache.add(timeline.lock_key(self.user.pk), 1)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertIsNone(cache.get(timeline.inbox_key(self.user.pk)))
+        cache.delete(timeline.lock_key(self.user.pk))
+        self.assertEqual(self.feed_texts(), [post.text])
+
+    def test_huge_follow_list_uses_join(self):
+        """При большом числе подписок лента читается через JOIN."""
+        for username in ('a', 'b'):
+            Follow.objects.create(
+                user=self.user,
+                author=User.objects.create_user(username=username),
+            )
+        Post.objects.create(text='Пост', author=self.author)
+        self.assertEqual(self.feed_texts(), ['Пост'])
+        self.assertIsNone(cache.get(timeline.inbox_key(self.user.pk)))
@@ -273,18 +273,14 @@ class PostPagesTests(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
 
     def test_index_cache(self):
-        """ Получить текущее количество постов, создать новый пост,
-        запросить страницу с постами и проверить что там нет нового поста,
-        затем очистить кеш, снова запросить страницу с постами и увидеть,
-        что там появился пост.
+        """ Главная страница отдаётся из кеша: изменение в базе в обход
+        сигналов не видно до очистки кеша, а новый пост сбрасывает кеш
+        и сразу появляется на странице.
         """
 
         posts_in_bd = self.guest_client.get(reverse('posts:index')).content
 
-        Post.objects.create(
-            text='Тестовый текст нового поста',
-            author=self.author,
-        )
+        Post.objects.filter(pk=self.post.pk).update(text='Обновлённый текст')
 
         posts_with_cache = self.guest_client.get(reverse
                                                  ('posts:index')).content
@@ -292,7 +288,7 @@ class PostPagesTests(TestCase):
         self.assertEqual(
             posts_in_bd,
             posts_with_cache,
-            'Количество постов отличается')
+            'Главная страница не закеширована')
 
         cache.clear()
 
@@ -302,7 +298,20 @@ class PostPagesTests(TestCase):
         self.assertNotEqual(
             posts_in_bd,
             posts_without_cache,
-            'Количество постов одинаково')
+            'Кеш главной страницы не очищается')
+
+        Post.objects.create(
+            text='Тестовый текст нового поста',
+            author=self.author,
+        )
+
+        posts_after_create = self.guest_client.get(reverse
+                                                   ('posts:index')).content
+
+        self.assertIn(
+            'Тестовый текст нового поста',
+            posts_after_create.decode(),
+            'Новый пост не сбрасывает кеш главной страницы')
 
     def test_add_follow(self):
         """ подписка: обращаешься к follow_index,
@@ -0,0 +1,104 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from core import prometheus
+
+from . import feed_cache
+from .models import Post, PostImageVariant
+
+logger = logging.getLogger(__name__)
+
+GEOMETRY = '960x339'
+OPTIONS = {'crop': 'center', 'upscale': True}
+FORMATS = {
+    PostImageVariant.JPEG: 'JPEG',
+    PostImageVariant.WEBP: 'WEBP',
+}
+
+_executor = None
+
+
+def executor():
+    """Пул потоков процесса; создаётся лениво, уже после fork воркера."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return _executor
+
+
+def build_variants(post):
+    """Миниатюры всех ширин из THUMBNAIL_WIDTHS в JPEG и WebP."""
+    full_width, full_height = map(int, GEOMETRY.split('x'))
+    variants = []
+    for width in settings.THUMBNAIL_WIDTHS:
+        height = round(width * full_height / full_width)
+        for image_format, engine_format in FORMATS.items():
+            thumbnail = get_thumbnail(
+                post.image, f'{width}x{height}',
+                format=engine_format, **OPTIONS
+            )
+            variants.append(PostImageVariant(
+                post=post, width=width, format=image_format,
+                image=thumbnail.name,
+            ))
+    return variants
+
+
+def generate(post_id):
+    """Строит миниатюры поста и записывает их в базу.
+
+    Post.thumbnail — основной JPEG для src, PostImageVariant — варианты
+    для srcset, чтобы шаблону не нужно было обращаться к хранилищу.
+    """
+    started = time.perf_counter()
+    try:
+        post = Post.objects.only('image').get(pk=post_id)
+        name = None
+        variants = []
+        if post.image:
+            name = get_thumbnail(post.image, GEOMETRY, **OPTIONS).name
+            variants = build_variants(post)
+        with transaction.atomic():
+            # Картинку могли сменить, пока строились миниатюры.
+            updated = Post.objects.filter(
+                pk=post_id, image=post.image.name
+            ).update(thumbnail=name, updated_at=timezone.now())
+            if updated:
+                PostImageVariant.objects.filter(post_id=post_id).delete()
+                PostImageVariant.objects.bulk_create(variants)
+        if updated:
+            feed_cache.invalidate()
+        prometheus.observe(
+            'yatube_thumbnail_duration_seconds',
+            time.perf_counter() - started
+        )
+        return name
+    except Exception:
+        logger.exception('Не удалось построить миниатюру поста %s', post_id)
+
+
+def generate_in_worker(post_id):
+    """generate() для потока пула: закрывает соединения потока с базой."""
+    try:
+        return generate(post_id)
+    finally:
+        connections.close_all()
+
+
+def schedule(post):
+    """Ставит построение миниатюры в пул после коммита транзакции."""
+    if not settings.THUMBNAIL_WORKERS:
+        transaction.on_commit(lambda: generate(post.pk))
+        return
+    transaction.on_commit(
+        lambda: executor().submit(generate_in_worker, post.pk)
+    )
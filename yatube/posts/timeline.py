@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Follow, Post, UserStats
+
+# Сколько секунд держится блокировка входящих при рассылке.
+LOCK_TIMEOUT = 5
+
+
+def inbox_key(user_id):
+    return f'posts:timeline:{user_id}'
+
+
+def lock_key(user_id):
+    return f'posts:timeline:{user_id}:lock'
+
+
+def celebrities(author_ids):
+    """Популярные авторы из author_ids: их посты не рассылаются.
+
+    Решение принимается по счётчику подписчиков в базе, одинаково при
+    рассылке и при чтении; список в кеше терялся бы при вытеснении и
+    гонке двух рассылок.
+    """
+    threshold = settings.TIMELINE_CELEBRITY_FOLLOWERS
+    counts = dict(
+        UserStats.objects.filter(user_id__in=author_ids)
+        .values_list('user_id', 'followers_count')
+    )
+    found = {user_id for user_id, count in counts.items() if count > threshold}
+    missing = set(author_ids) - set(counts)
+    if missing:
+        # Строка счётчиков создаётся при первом обращении (get_stats);
+        # без неё подписчики считаются по таблице подписок.
+        found.update(
+            Follow.objects.filter(author_id__in=missing).order_by()
+            .values('author_id').annotate(total=Count('pk'))
+            .filter(total__gt=threshold).values_list('author_id', flat=True)
+        )
+    return found
+
+
+def pull_posts(user):
+    """Лента подписок через JOIN по таблице подписок."""
+    return Post.objects.filter(author__following__user=user)
+
+
+def fan_out(post):
+    """Кладёт id нового поста во входящие подписчиков автора.
+
+    Авторы с очень большим числом подписчиков рассылку не делают:
+    их посты читатели забирают сами при чтении ленты.
+    """
+    if not settings.TIMELINE_FANOUT or celebrities([post.author_id]):
+        return
+    followers = list(
+        Follow.objects.filter(author_id=post.author_id)
+        .values_list('user_id', flat=True)
+    )
+
+    # Обновляем только уже собранные ящики: отсутствующий будет
+    # построен целиком при следующем чтении. Ящик меняется под
+    # блокировкой, иначе две одновременные рассылки потеряли бы один
+    # id; ящик, который не удалось заблокировать, удаляется.
+    present = cache.get_many([inbox_key(user_id) for user_id in followers])
+    locked = [
+        user_id for user_id in followers
+        if inbox_key(user_id) in present
+        and cache.add(lock_key(user_id), 1, timeout=LOCK_TIMEOUT)
+    ]
+    cache.delete_many([
+        inbox_key(user_id) for user_id in followers
+        if inbox_key(user_id) in present and user_id not in locked
+    ])
+    try:
+        # Перечитываем под блокировкой: ящик мог успеть измениться.
+        inboxes = cache.get_many([inbox_key(user_id) for user_id in locked])
+        for inbox in inboxes.values():
+            inbox['ids'].insert(0, post.pk)
+            if len(inbox['ids']) > settings.TIMELINE_LENGTH:
+                del inbox['ids'][settings.TIMELINE_LENGTH:]
+                inbox['complete'] = False
+        cache.set_many(inboxes, timeout=settings.TIMELINE_TIMEOUT)
+    finally:
+        cache.delete_many([lock_key(user_id) for user_id in locked])
+
+
+def drop_inbox(user_id):
+    cache.delete(inbox_key(user_id))
+
+
+def build_inbox(user):
+    ids = list(
+        pull_posts(user).order_by('-pub_date', '-pk')
+        .values_list('pk', flat=True)[:settings.TIMELINE_LENGTH + 1]
+    )
+    inbox = {
+        'ids': ids[:settings.TIMELINE_LENGTH],
+        'complete': len(ids) <= settings.TIMELINE_LENGTH,
+    }
+    cache.set(inbox_key(user.pk), inbox, timeout=settings.TIMELINE_TIMEOUT)
+    return inbox
+
+
+def following_posts(user):
+    """Посты ленты подписок.
+
+    Пока рассылка включена и подписок немного, лента читается из
+    входящих по списку id плюс посты популярных авторов. Если входящие
+    обрезаны (complete=False), всё, что старше самого старого поста из
+    них, читается по таблице подписок: иначе за окном входящих остались
+    бы только посты популярных авторов.
+    """
+    if not settings.TIMELINE_FANOUT:
+        return pull_posts(user)
+
+    authors = list(
+        Follow.objects.filter(user=user)
+        .values_list('author_id', flat=True)
+        [:settings.TIMELINE_MAX_FOLLOWING + 1]
+    )
+    if len(authors) > settings.TIMELINE_MAX_FOLLOWING:
+        return pull_posts(user)
+
+    inbox = cache.get(inbox_key(user.pk))
+    if inbox is None:
+        inbox = build_inbox(user)
+    head = Q(pk__in=inbox['ids']) | Q(author_id__in=celebrities(authors))
+    if inbox['complete']:
+        return Post.objects.filter(head)
+
+    floor = Post.objects.filter(pk__in=inbox['ids'][-1:]).values_list(
+        'pub_date', 'pk'
+    ).first()
+    if floor is None:
+        return pull_posts(user)
+    pub_date, pk = floor
+    older = Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+    return Post.objects.filter(
+        (head & ~older)
+        | (older & Q(author_id__in=Follow.objects.filter(
+            user=user
+        ).values('author_id')))
+    )
@@ -2,7 +2,7 @@ from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
 
-from . import views
+from . import api, views
 
 app_name = 'posts'
 
@@ -17,6 +17,26 @@ urlpatterns = [
          views.follow_index,
          name='follow_index'),
 
+    path('search/',
+         views.search,
+         name='search'),
+
+    path('api/posts/', api.index, name='api_index'),
+
+    path('api/posts/<int:post_id>/',
+         api.post_detail,
+         name='api_post_detail'),
+
+    path('api/group/<slug:slug>/',
+         api.group_posts,
+         name='api_group_list'),
+
+    path('api/profile/<str:username>/',
+         api.profile,
+         name='api_profile'),
+
+    path('api/follow/', api.follow_index, name='api_follow_index'),
+
     path('<str:username>/',
          views.profile,
          name='profile'),
@@ -41,6 +61,10 @@ urlpatterns = [
 
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
 
+    path('posts/<int:post_id>/comments/',
+         views.comments,
+         name='comments'),
+
     path('<str:username>/<int:post_id>/',
          views.post_detail,
          name='post_detail'),
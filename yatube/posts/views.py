@@ -1,34 +1,55 @@
-from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.http import Http404, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
-from django.views.decorators.http import require_GET
-from django.core.cache import cache
+from django.views.decorators.http import condition, require_GET
 
+from core.db.routers import replica_reads
+
+from . import conditional, counters, feed_cache, thumbnails, timeline
 from .forms import CommentForm, PostForm
-from .models import Follow, Post, Group, User
+from .models import Comment, Follow, Post, PostImageVariant, Group, User
+from .paginator import CursorPaginator
+from .search import get_backend
+
+
+def feed(posts):
+    """Посты ленты вместе с автором, группой и вариантами картинки."""
+    return posts.select_related('author', 'group').prefetch_related(
+        'image_variants'
+    )
+
 
+def paginate(request, posts):
+    """Страница ленты по курсору из параметра ?cursor=."""
+    paginator = CursorPaginator(posts, settings.POSTS_PER_PAGE)
+    return paginator.get_page(request.GET.get('cursor'))
 
+
+@replica_reads
 @require_GET
 def index(request):
-    posts = cache.get('posts:index')
-    if posts is None:
-        posts = Post.objects.select_related('group').all()
-        cache.set('posts:index', posts, timeout=20)
-
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page_obj')
-    page = paginator.get_page(page_number)
+    page = feed_cache.get_page(
+        feed_cache.INDEX,
+        request.GET.get('cursor'),
+        lambda: paginate(request, feed(Post.objects.all())),
+    )
 
     return render(request, 'posts/index.html', {'page_obj': page})
 
 
+@replica_reads
+@condition(etag_func=conditional.group_posts_etag)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post = group.posts.all()
-    paginator = Paginator(post, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page_obj')
-    page = paginator.get_page(page_number)
+    page = feed_cache.get_page(
+        feed_cache.GROUP,
+        request.GET.get('cursor'),
+        lambda: paginate(request, feed(group.posts.all())),
+        scope=group.pk,
+    )
 
     return render(
         request,
@@ -37,29 +58,64 @@ def group_posts(request, slug):
     )
 
 
-def post_detail(request, post_id, username=None):
-    post_detail = get_object_or_404(Post, id=post_id)
-    form = CommentForm()
-    comments = post_detail.comments.all()
+def comment_page(post_id, cursor):
+    """Страница комментариев по ключу (created, id), новые сверху."""
+    comments = Comment.objects.filter(post_id=post_id).select_related('author')
+    paginator = CursorPaginator(
+        comments, settings.COMMENTS_PER_PAGE, field='created'
+    )
+    return paginator.get_page(cursor)
 
-    posts_count = post_detail.author.posts.count()
-    followers_count = Follow.objects.count()
 
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user, author=post_detail.author).exists()
+@replica_reads
+@condition(etag_func=conditional.post_detail_etag)
+def post_detail(request, post_id, username=None):
+    post_detail = conditional.detail_post(request, post_id)
+    if post_detail is None:
+        raise Http404
+    if post_detail.image:
+        prefetch_related_objects([post_detail], 'image_variants')
+    stats = counters.get_stats(post_detail.author)
 
     context = {
-        'form': form,
+        'form': CommentForm(),
         'post_detail': post_detail,
-        'posts_count': posts_count,
-        'comments': comments,
-        'followers_count': followers_count,
-        'following': following,
+        'posts_count': stats.posts_count,
+        'comments': comment_page(post_id, request.GET.get('comments')),
+        'followers_count': stats.followers_count,
+        'follow_count': stats.following_count,
+        'following': post_detail.is_following,
     }
 
     return render(request, 'posts/post_detail.html', context)
 
 
+@replica_reads
+@require_GET
+def comments(request, post_id):
+    """Следующая страница комментариев: HTML-фрагмент или ?format=json."""
+    page = comment_page(post_id, request.GET.get('cursor'))
+    if not page.object_list and not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'results': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created,
+                }
+                for comment in page
+            ],
+            'next': page.next_cursor,
+        }, json_dumps_params={'ensure_ascii': False})
+    return render(
+        request, 'includes/comment_list.html',
+        {'comments': page, 'post_id': post_id}
+    )
+
+
 @login_required
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, id=post_id)
@@ -82,6 +138,8 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        if post.image:
+            thumbnails.schedule(post)
 
         return redirect('posts:profile', post.author.username)
 
@@ -105,7 +163,22 @@ def post_edit(request, username, post_id):
     )
 
     if form.is_valid():
-        post.save()
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            post.thumbnail = None
+        with transaction.atomic():
+            # Только поля формы: полный save() записал бы comments_count,
+            # прочитанный в начале запроса, поверх параллельного F() + 1.
+            post.save(update_fields=[
+                *PostForm.Meta.fields, 'updated_at', 'thumbnail'
+            ])
+            if image_changed:
+                # Иначе srcset старой картинки остался бы рядом с новым
+                # src, пока не достроятся миниатюры (или навсегда, если
+                # построение упадёт).
+                PostImageVariant.objects.filter(post=post).delete()
+        if image_changed:
+            thumbnails.schedule(post)
 
         return redirect('posts:post_detail', post.id)
 
@@ -116,37 +189,49 @@ def post_edit(request, username, post_id):
     )
 
 
+@replica_reads
+@condition(etag_func=conditional.profile_etag)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-
-    paginator = Paginator(author.posts.all(), settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page_obj')
-    page = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    stats = counters.get_stats(author)
 
-    posts_count = author.posts.count()
-    followers_count = Follow.objects.count()
+    page = feed_cache.get_page(
+        feed_cache.PROFILE,
+        request.GET.get('cursor'),
+        lambda: paginate(request, feed(author.posts.all())),
+        scope=author.pk,
+    )
 
     following = request.user.is_authenticated and Follow.objects.filter(
         user=request.user, author=author).exists()
 
     context = {
         'author': author,
-        'posts_count': posts_count,
+        'posts_count': stats.posts_count,
         'page_obj': page,
-        'followers_count': followers_count,
+        'followers_count': stats.followers_count,
+        'follow_count': stats.following_count,
         'following': following,
     }
 
     return render(request, 'posts/profile.html', context)
 
 
+def following_page(request):
+    return paginate(request, feed(timeline.following_posts(request.user)))
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page_obj')
-    page = paginator.get_page(page_number)
+    page = feed_cache.get_page(
+        feed_cache.FOLLOW,
+        request.GET.get('cursor'),
+        lambda: following_page(request),
+        scope=request.user.pk,
+        generations=(feed_cache.POSTS, feed_cache.FOLLOWS),
+    )
 
     return render(request, "posts/follow.html", {'page_obj': page})
 
@@ -171,3 +256,29 @@ def profile_unfollow(request, username):
         Follow.objects.filter(author=author, user=request.user).delete()
 
     return redirect('posts:profile', username)
+
+
+@require_GET
+def search(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        number = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        number = 1
+
+    per_page = settings.POSTS_PER_PAGE
+    ids = []
+    if query:
+        ids = get_backend().search(
+            query, (number - 1) * per_page, per_page + 1
+        )
+    found = feed(Post.objects.all()).in_bulk(ids[:per_page])
+
+    context = {
+        'query': query,
+        'posts': [found[pk] for pk in ids[:per_page] if pk in found],
+        'number': number,
+        'has_next': len(ids) > per_page,
+    }
+
+    return render(request, 'posts/search.html', context)
@@ -0,0 +1,19 @@
+"""Настройки проекта по профилям: DJANGO_ENV=dev (по умолчанию) или prod.
+
+Общее лежит в base.py, профиль переопределяет значения по умолчанию;
+отдельные настройки задаются переменными окружения (см. base.py).
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'dev')
+
+if DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'DJANGO_ENV={DJANGO_ENV}: ожидается dev или prod.'
+    )
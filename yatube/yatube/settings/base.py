@@ -0,0 +1,333 @@
+"""Общие настройки всех профилей. Профиль выбирается в __init__.py."""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+SECRET_KEY = os.environ.get('SECRET_KEY')
+
+DEBUG = False
+
+# Через запятую. Значение по умолчанию есть только у профиля
+# разработки: боевой без ALLOWED_HOSTS не запускается.
+ALLOWED_HOSTS = [
+    host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host
+]
+
+INSTALLED_APPS = [
+    'sorl.thumbnail',
+    'about.apps.AboutConfig',
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
+    'core.middleware.QueryWatchMiddleware',
+    'core.middleware.PrimaryPinMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+FEED_CACHE_TIMEOUT = 20
+# Записей в кеше L1 каждого процесса (core.tiered) перед общим кешем.
+TIERED_CACHE_SIZE = 500
+
+# Лента подписок с рассылкой при записи. Входящие лежат в кеше, поэтому
+# включать стоит только с общим для всех воркеров кешем.
+TIMELINE_FANOUT = False
+TIMELINE_LENGTH = 800
+TIMELINE_TIMEOUT = 60 * 60 * 24
+TIMELINE_MAX_FOLLOWING = 1000
+TIMELINE_CELEBRITY_FOLLOWERS = 10000
+
+# Потоков для построения миниатюр; 0 — строить в запросе сразу после
+# коммита (так ведут себя тесты и локальная разработка, в боевом
+# профиле пул включён, см. prod.py).
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 0))
+# Ширины вариантов картинки для srcset.
+THUMBNAIL_WIDTHS = (320, 640, 960)
+
+# Наибольший ?limit= для JSON API лент.
+API_MAX_LIMIT = 1000
+
+# Доля запросов, для которых замеряются SQL и шаблоны (0..1); при 0
+# middleware замеров отключается.
+INSTRUMENTATION_SAMPLE_RATE = float(
+    os.environ.get('INSTRUMENTATION_SAMPLE_RATE', 0)
+)
+
+# Журнал N+1 и медленных запросов в логгер core.queries; для стейджинга.
+QUERY_WATCH = os.environ.get('QUERY_WATCH') == '1'
+# Запрос одной формы больше стольких раз за запрос считается N+1.
+NPLUSONE_THRESHOLD = 5
+SLOW_QUERY_MS = 100
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.queries': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
+# Метрики Prometheus на /metrics. С несколькими воркерами укажите общий
+# для них каталог METRICS_DIR и очищайте его при перезапуске сервиса.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_DIR = os.environ.get('METRICS_DIR')
+
+# Токен сборщика метрик: /metrics отдаются с заголовком
+# Authorization: Bearer <токен> или персоналу. Адрес клиента не
+# проверяется: за обратным прокси все запросы приходят с 127.0.0.1.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+FAILURE_VIEW = 'core.views.failure'
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def template_loaders(cached):
+    """С cached скомпилированные шаблоны хранятся в памяти процесса и
+    не читаются с диска повторно; правки шаблонов видны только после
+    перезапуска. Воркер прогревает кеш при старте (yatube/wsgi.py).
+    """
+    if cached:
+        return [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+    return TEMPLATE_LOADERS
+
+
+TEMPLATE_CACHE = os.environ.get('TEMPLATE_CACHE') == '1'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+            'loaders': template_loaders(TEMPLATE_CACHE),
+        },
+    }
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/4.0/ref/settings/#databases
+
+# Настройки базы берутся из окружения. DB_ENGINE — sqlite3 или
+# postgresql. DB_POOL_SIZE > 0 включает пул соединений процесса
+# (core.db.backends.*); тогда соединения возвращаются в пул в конце
+# запроса, и CONN_MAX_AGE по умолчанию 0.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3')
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+
+
+def database(name, host=''):
+    backends = 'core.db.backends' if DB_POOL_SIZE else 'django.db.backends'
+    return {
+        'ENGINE': f'{backends}.{DB_ENGINE}',
+        'NAME': name,
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': host,
+        'PORT': os.environ.get('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get(
+            'DB_CONN_MAX_AGE', 0 if DB_POOL_SIZE else 60
+        )),
+        'POOL_SIZE': DB_POOL_SIZE,
+    }
+
+
+if DB_ENGINE == 'sqlite3':
+    DATABASES = {'default': database(
+        os.environ.get('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3'))
+    )}
+else:
+    DATABASES = {'default': database(
+        os.environ.get('DB_NAME', 'yatube'), os.environ.get('DB_HOST', '')
+    )}
+
+# Реплика для чтения (index, group_posts, profile, post_detail). Для
+# SQLite это второй файл, который обновляет manage.py sync_replica.
+if os.environ.get('DB_REPLICA') == '1':
+    if DB_ENGINE == 'sqlite3':
+        DATABASES['replica'] = database(os.environ.get(
+            'DB_REPLICA_NAME', os.path.join(BASE_DIR, 'db.replica.sqlite3')
+        ))
+    else:
+        DATABASES['replica'] = database(
+            DATABASES['default']['NAME'],
+            os.environ.get('DB_REPLICA_HOST', '')
+        )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# PRAGMA для каждого нового соединения с SQLite. В режиме WAL чтение не
+# ждёт записи; synchronous=NORMAL в WAL при сбое питания может потерять
+# последние транзакции, но не портит базу.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+# Сколько секунд после записи пользователь читает с основной базы.
+REPLICA_PIN_SECONDS = 5
+
+# Полнотекстовый поиск; posts.search.IContainsBackend работает с любой
+# базой, но без индекса.
+SEARCH_BACKEND = (
+    'posts.search.SQLiteFTSBackend' if DB_ENGINE == 'sqlite3'
+    else 'posts.search.IContainsBackend'
+)
+
+
+# Password validation
+# https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.0/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+# CACHE_BACKEND — один из CACHE_BACKENDS, CACHE_LOCATION — файл для
+# sqlite, каталог для file или адрес memcached. LocMemCache у каждого
+# воркера свой: лента подписок с рассылкой (TIMELINE_FANOUT) требует
+# общего кеша. core.cache.SQLiteCache общий для воркеров одного сервера
+# и не требует отдельного сервиса.
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'sqlite': 'core.cache.SQLiteCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'memcached': 'django.core.cache.backends.memcached.PyLibMCCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+CACHE_LOCATIONS = {
+    'sqlite': os.path.join(BASE_DIR, 'cache.sqlite3'),
+    'file': os.path.join(BASE_DIR, 'cache'),
+}
+
+
+def cache(backend):
+    if backend not in CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f'CACHE_BACKEND={backend}: ожидается одно из '
+            f'{", ".join(CACHE_BACKENDS)}'
+        )
+    config = {
+        'BACKEND': CACHE_BACKENDS[backend],
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION', CACHE_LOCATIONS.get(backend, '')
+        ),
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', 300)),
+    }
+    if backend in CACHE_LOCATIONS:
+        config['OPTIONS'] = {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 10000)),
+        }
+    return {'default': config}
+
+
+CACHES = cache(os.environ.get('CACHE_BACKEND', 'locmem'))
+
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.db'
+)
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.0/howto/static-files/
+
+STATICFILES_STORAGE = os.environ.get(
+    'STATICFILES_STORAGE',
+    'django.contrib.staticfiles.storage.StaticFilesStorage'
+)
+
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+STATICFILES_DIRS = [
+    os.path.join(BASE_DIR, 'staticfiles'),
+]
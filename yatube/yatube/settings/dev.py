@@ -0,0 +1,19 @@
+"""Локальная разработка и тесты: DEBUG, шаблоны читаются с диска."""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS
+
+DEBUG = os.environ.get('DEBUG', '1') == '1'
+
+SECRET_KEY = os.environ.get(
+    'SECRET_KEY',
+    'django-insecure--f-@6h^n@o0xn8r-ojni=%1_a22xu+-fh^oc*=oi!ky3crsljg'
+)
+
+ALLOWED_HOSTS = ALLOWED_HOSTS or [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
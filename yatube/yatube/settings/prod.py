@@ -0,0 +1,38 @@
+"""Боевой профиль: всё, что ускоряет ответ, включено по умолчанию.
+
+Любую настройку по-прежнему можно переопределить переменной окружения.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import (
+    ALLOWED_HOSTS, SECRET_KEY, TEMPLATES, cache, template_loaders
+)
+
+DEBUG = False
+
+if not SECRET_KEY:
+    raise ImproperlyConfigured('В боевом профиле нужен SECRET_KEY.')
+if not ALLOWED_HOSTS:
+    raise ImproperlyConfigured('В боевом профиле нужен ALLOWED_HOSTS.')
+
+# Шаблоны компилируются один раз на процесс и прогреваются при старте.
+TEMPLATE_CACHE = os.environ.get('TEMPLATE_CACHE', '1') == '1'
+TEMPLATES[0]['OPTIONS']['loaders'] = template_loaders(TEMPLATE_CACHE)
+
+# Общий для воркеров одного сервера кеш вместо LocMemCache у каждого.
+CACHES = cache(os.environ.get('CACHE_BACKEND', 'sqlite'))
+
+# Миниатюры строятся в фоновом пуле, а не внутри запроса с загрузкой.
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))
+
+# Сессия читается из кеша, в базу — только при записи.
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+)
+
+STATICFILES_STORAGE = os.environ.get(
+    'STATICFILES_STORAGE', 'core.storage.CompressedManifestStaticFilesStorage'
+)
@@ -4,6 +4,8 @@ from django.conf.urls import handler404, handler500
 from django.conf.urls.static import static
 from django.conf import settings
 
+from core import views as core_views
+
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
 handler403 = 'core.views.failure'
@@ -11,7 +13,10 @@ handler403 = 'core.views.failure'
 
 urlpatterns = [
     path('about/', include('about.urls', namespace='about')),
+    path('metrics', core_views.metrics, name='metrics'),
     path('', include('posts.urls', namespace='posts')),
+    path('admin/instrumentation/', core_views.instrumentation,
+         name='instrumentation'),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),